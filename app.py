@@ -1,15 +1,46 @@
 import streamlit as st
 import os
 import io
+import re
+import hashlib
+import time
+from contextlib import closing
 from pathlib import Path
 from datetime import datetime
-from pdf_utils import get_pdf_info, chunk_text
-from translation import initialize_gemini_api, translate_chunks, translate_text, translate_image, translate_pdf_pages
-from pdf2image import convert_from_bytes
-import fitz  # PyMuPDF
-from PIL import Image  # Add this import
-import docx2txt
-from file_utils import process_image_file, process_docx_file, process_pdf_file
+
+# PDF, imaging and Gemini modules are imported where they are first needed,
+# so the upload page is interactive before those libraries are loaded
+from translation_store import (open_translation_store, save_page_translation, load_page_translations,
+                               open_page_cache, save_cached_translation, load_cached_translation)
+
+# Languages offered for translation. The literal tuple is a constant of the
+# compiled script, so it is not rebuilt when Streamlit reruns the script.
+LANGUAGES = (
+    "Arabic", "English", "French", "German", "Spanish", "Italian", "Chinese",
+    "Japanese", "Korean", "Portuguese", "Russian", "Hindi", "Bengali", "Urdu",
+    "Turkish", "Vietnamese", "Thai", "Dutch", "Greek", "Swedish", "Norwegian",
+    "Danish", "Finnish", "Polish", "Czech", "Hungarian", "Romanian", "Slovak",
+    "Bulgarian", "Croatian", "Serbian", "Slovenian", "Malay", "Indonesian", "Filipino",
+    "Hebrew", "Persian", "Swahili", "Zulu", "Afrikaans", "Ukrainian", "Catalan",
+    "Basque", "Galician", "Welsh", "Irish", "Scottish Gaelic", "Icelandic", "Latvian",
+    "Lithuanian", "Estonian", "Maltese", "Luxembourgish", "Albanian", "Macedonian", "Bosnian",
+    "Armenian", "Georgian", "Azerbaijani", "Kazakh", "Uzbek", "Tajik", "Kyrgyz",
+    "Turkmen", "Mongolian", "Pashto", "Sinhala", "Tamil", "Telugu", "Kannada",
+    "Malayalam", "Marathi", "Gujarati", "Punjabi", "Odia", "Assamese", "Maithili",
+    "Nepali", "Burmese", "Khmer", "Lao", "Hmong", "Yoruba", "Hausa",
+    "Igbo", "Amharic", "Tigrinya", "Somali", "Shona", "Xhosa", "Tswana",
+    "Sesotho", "Chichewa", "Malagasy", "Fijian", "Samoan", "Tongan", "Maori",
+)
+SOURCE_LANGUAGES = ("Auto-Detect",) + LANGUAGES
+
+# File types accepted by the uploader
+SUPPORTED_FILE_TYPES = ("pdf", "docx", "png", "jpg", "jpeg")
+
+# Minimum time in seconds between two refreshes of the progress and live view
+PROGRESS_UPDATE_INTERVAL = 0.25
+
+# Documents longer than this get a page-range input instead of a multiselect
+MULTISELECT_MAX_PAGES = 200
 
 # Set page config
 st.set_page_config(
@@ -23,18 +54,16 @@ if "uploaded_file" not in st.session_state:
     st.session_state.uploaded_file = None
 if "pdf_info" not in st.session_state:
     st.session_state.pdf_info = None
-if "translated_text" not in st.session_state:
-    st.session_state.translated_text = ""
+if "file_hash" not in st.session_state:
+    st.session_state.file_hash = None
+if "translation_request" not in st.session_state:
+    st.session_state.translation_request = None
 if "translation_completed" not in st.session_state:
     st.session_state.translation_completed = False
 if "api_key_valid" not in st.session_state:
     st.session_state.api_key_valid = False
 if "selected_pages" not in st.session_state:
     st.session_state.selected_pages = []
-if "page_translations" not in st.session_state:
-    st.session_state.page_translations = {}
-if "page_images" not in st.session_state:
-    st.session_state.page_images = {}
 
 # Application title and introduction
 st.title("📚 Multi-Language PDF Translator")
@@ -89,55 +118,25 @@ col1, col2 = st.columns(2)
 with col1:
     source_lang = st.selectbox(
         "Select source language:",
-        [
-            "Auto-Detect","Arabic", "English", "French", "German", "Spanish", "Italian", "Chinese", 
-            "Japanese", "Korean", "Portuguese", "Russian", "Hindi", "Bengali", 
-            "Urdu", "Turkish", "Vietnamese", "Thai", "Dutch", "Greek", "Swedish", 
-            "Norwegian", "Danish", "Finnish", "Polish", "Czech", "Hungarian", 
-            "Romanian", "Slovak", "Bulgarian", "Croatian", "Serbian", "Slovenian", 
-            "Malay", "Indonesian", "Filipino", "Hebrew", "Persian", "Swahili", 
-            "Zulu", "Afrikaans", "Ukrainian", "Catalan", "Basque", "Galician", 
-            "Welsh", "Irish", "Scottish Gaelic", "Icelandic", "Latvian", "Lithuanian", 
-            "Estonian", "Maltese", "Luxembourgish", "Albanian", "Macedonian", 
-            "Bosnian", "Armenian", "Georgian", "Azerbaijani", "Kazakh", "Uzbek", 
-            "Tajik", "Kyrgyz", "Turkmen", "Mongolian", "Pashto", "Sinhala", 
-            "Tamil", "Telugu", "Kannada", "Malayalam", "Marathi", "Gujarati", 
-            "Punjabi", "Odia", "Assamese", "Maithili", "Nepali", "Burmese", 
-            "Khmer", "Lao", "Hmong", "Yoruba", "Hausa", "Igbo", "Amharic", 
-            "Tigrinya", "Somali", "Shona", "Xhosa", "Tswana", "Sesotho", 
-            "Chichewa", "Malagasy", "Fijian", "Samoan", "Tongan", "Maori"
-        ],
+        SOURCE_LANGUAGES,
         index=0
     )
 with col2:
     target_lang = st.selectbox(
         "Select target language:",
-[
-            "Arabic", "English", "French", "German", "Spanish", "Italian", "Chinese", 
-            "Japanese", "Korean", "Portuguese", "Russian", "Hindi", "Bengali", 
-            "Urdu", "Turkish", "Vietnamese", "Thai", "Dutch", "Greek", "Swedish", 
-            "Norwegian", "Danish", "Finnish", "Polish", "Czech", "Hungarian", 
-            "Romanian", "Slovak", "Bulgarian", "Croatian", "Serbian", "Slovenian", 
-            "Malay", "Indonesian", "Filipino", "Hebrew", "Persian", "Swahili", 
-            "Zulu", "Afrikaans", "Ukrainian", "Catalan", "Basque", "Galician", 
-            "Welsh", "Irish", "Scottish Gaelic", "Icelandic", "Latvian", "Lithuanian", 
-            "Estonian", "Maltese", "Luxembourgish", "Albanian", "Macedonian", 
-            "Bosnian", "Armenian", "Georgian", "Azerbaijani", "Kazakh", "Uzbek", 
-            "Tajik", "Kyrgyz", "Turkmen", "Mongolian", "Pashto", "Sinhala", 
-            "Tamil", "Telugu", "Kannada", "Malayalam", "Marathi", "Gujarati", 
-            "Punjabi", "Odia", "Assamese", "Maithili", "Nepali", "Burmese", 
-            "Khmer", "Lao", "Hmong", "Yoruba", "Hausa", "Igbo", "Amharic", 
-            "Tigrinya", "Somali", "Shona", "Xhosa", "Tswana", "Sesotho", 
-            "Chichewa", "Malagasy", "Fijian", "Samoan", "Tongan", "Maori"
-        ],
+        LANGUAGES,
         index=5  # Italian
     )
 
-if source_lang == target_lang:
+# Translating into the same language would only spend API calls, so it is blocked
+same_lang = source_lang == target_lang
+if same_lang:
     st.warning("Source and target languages must be different.")
 
 # Function to validate API key
 def validate_api_key():
+    from translation import initialize_gemini_api
+    
     if api_key:
         try:
             if not api_key:
@@ -156,33 +155,170 @@ def validate_api_key():
         st.session_state.api_key_valid = False
         return False
 
+# Cached helpers, keyed on the file hash so widget reruns reuse the results.
+# The underscore arguments are not hashed by Streamlit on every call.
+@st.cache_data(show_spinner=False, max_entries=32)
+def get_file_info(file_hash: str, _file_bytes: bytes, file_type: str):
+    """Parse an uploaded file and return its info."""
+    from file_utils import FILE_PROCESSORS
+    
+    if file_type not in FILE_PROCESSORS:
+        raise Exception(f"Unsupported file type: {file_type}")
+    return FILE_PROCESSORS[file_type](io.BytesIO(_file_bytes))
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_page_thumbnails(file_hash: str, page_nums: tuple, _pdf_bytes: bytes):
+    """Render small previews of PDF pages, cached by file hash and pages."""
+    from pdf_utils import render_page_thumbnails
+    
+    return render_page_thumbnails(_pdf_bytes, list(page_nums))
+
+def content_hash(data: bytes, salt: bytes) -> str:
+    """Hash the content of a page, the key of the shared translation cache, salted with the translation settings."""
+    return hashlib.blake2b(data, digest_size=16, salt=salt).hexdigest()
+
+def parse_page_ranges(ranges: str, num_pages: int):
+    """
+    Parse a page-range string such as "1-20, 35, 60-80".
+    
+    Args:
+        ranges: Comma separated page numbers and ranges (1-indexed)
+        num_pages: Number of pages in the document
+    
+    Returns:
+        Sorted list of unique page numbers (0-indexed)
+    """
+    pages = set()
+    for start, end in re.findall(r"(\d+)\s*(?:-\s*(\d+))?", ranges):
+        first, last = int(start), int(end or start)
+        pages.update(range(max(first, 1) - 1, min(last, num_pages)))
+    return sorted(pages)
+
+@st.fragment
+def translation_options(num_pages: int):
+    """
+    Show the page selection and image settings.
+    
+    This runs as a fragment, so changing these widgets only reruns this panel.
+    The chosen values are kept in the session state for the translation step.
+    """
+    # Page selection options
+    page_selection_option = st.radio(
+        "Select pages to translate:",
+        ["All pages", "Select specific pages"],
+        index=0,
+        horizontal=True
+    )
+    
+    # If "Select specific pages" is chosen
+    if page_selection_option == "Select specific pages":
+        if num_pages > MULTISELECT_MAX_PAGES:
+            # A multiselect with thousands of options is slow, take ranges instead
+            page_ranges = st.text_input("Pages to translate (e.g. 1-20, 35, 60-80):", value="1")
+            st.session_state.selected_pages = parse_page_ranges(page_ranges, num_pages)
+        else:
+            # Create a multiselect for selecting pages
+            page_options = list(range(1, num_pages + 1))
+            selected_pages = st.multiselect(
+                "Select pages to translate:",
+                page_options,
+                default=page_options[:1],  # Default to first page if available
+                format_func=lambda page: f"Page {page}"
+            )
+            
+            # Convert selected pages to page numbers (0-indexed)
+            st.session_state.selected_pages = [page - 1 for page in selected_pages]
+    else:
+        # All pages
+        st.session_state.selected_pages = list(range(num_pages))
+    
+    # Image quality settings, smaller images upload faster and use fewer tokens
+    col1, col2 = st.columns(2)
+    with col1:
+        st.select_slider(
+            "Render DPI:",
+            options=[150, 200, 250, 300],
+            value=150,
+            key="render_dpi"
+        )
+    with col2:
+        st.number_input(
+            "Max image side (px):",
+            min_value=512,
+            max_value=2048,
+            value=1600,
+            step=100,
+            key="max_image_size"
+        )
+    
+    # Number of page images sent to Gemini in a single request
+    st.slider(
+        "Pages per API call:",
+        min_value=1,
+        max_value=8,
+        value=4,
+        help="Sending several pages in one request reduces the number of API round-trips",
+        key="batch_size"
+    )
+    
+    # Number of Gemini requests in flight at the same time
+    st.slider(
+        "Parallel requests:",
+        min_value=1,
+        max_value=16,
+        value=8,
+        help="Lower this if the API key runs into rate limits",
+        key="concurrency"
+    )
+    
+    # Born-digital pages can be translated from their embedded text
+    st.checkbox(
+        "Auto-detect born-digital pages (faster)",
+        value=True,
+        help="Pages with selectable text are translated from their text instead of an image",
+        key="detect_text_layer"
+    )
+
+def combine_page_translations(page_translations):
+    """Join per-page translations into a single text, in page order."""
+    return "\n\n".join(
+        f"--- Page {page_num + 1} ---\n{text}"
+        for page_num, text in sorted(page_translations.items())
+    )
+
 # File uploader with multiple types
 uploaded_file = st.file_uploader(
     "Choose a file (PDF, DOCX, or Image)", 
-    type=["pdf", "docx", "png", "jpg", "jpeg"]
+    type=SUPPORTED_FILE_TYPES
 )
 
+# Release the document and its results once it is removed from the uploader.
+# The translations themselves stay in the on-disk store for later runs.
+if uploaded_file is None and st.session_state.uploaded_file is not None:
+    st.session_state.uploaded_file = None
+    st.session_state.pdf_info = None
+    st.session_state.file_hash = None
+    st.session_state.translation_request = None
+    st.session_state.translation_completed = False
+    st.session_state.selected_pages = []
+
 # Update session state when a new file is uploaded
 if uploaded_file is not None and (st.session_state.uploaded_file is None or st.session_state.uploaded_file.name != uploaded_file.name):
     st.session_state.uploaded_file = uploaded_file
     st.session_state.extracted_text = ""
-    st.session_state.translated_text = ""
     st.session_state.translation_completed = False
     st.session_state.selected_pages = []
     st.session_state.page_texts = {}
-    st.session_state.page_translations = {}
     
     try:
+        # Translations of this file are stored on disk under its content hash
+        file_bytes = uploaded_file.getvalue()
+        st.session_state.file_hash = hashlib.blake2b(file_bytes, digest_size=8).hexdigest()
+        
         # Process different file types
-        file_type = uploaded_file.name.split('.')[-1].lower()
+        file_type = Path(uploaded_file.name).suffix.lstrip('.').lower()
+        st.session_state.pdf_info = get_file_info(st.session_state.file_hash, file_bytes, file_type)
         
-        if file_type == 'pdf':
-            st.session_state.pdf_info = process_pdf_file(uploaded_file)
-        elif file_type in ['png', 'jpg', 'jpeg']:
-            st.session_state.pdf_info = process_image_file(uploaded_file)
-        elif file_type == 'docx':
-            st.session_state.pdf_info = process_docx_file(uploaded_file)
-            
     except Exception as e:
         st.error(f"Error processing file: {str(e)}")
         st.session_state.pdf_info = None
@@ -205,116 +341,164 @@ if st.session_state.uploaded_file is not None and st.session_state.pdf_info is n
     st.write("---")
     st.subheader("📝 Text Extraction and Translation Options")
     
-    # Page selection options
-    page_selection_option = st.radio(
-        "Select pages to translate:",
-        ["All pages", "Select specific pages"],
-        index=0,
-        horizontal=True
-    )
-    
-    # If "Select specific pages" is chosen
-    if page_selection_option == "Select specific pages":
-        # Create a multiselect for selecting pages
-        page_options = [f"Page {i+1}" for i in range(pdf_info['num_pages'])]
-        selected_pages = st.multiselect(
-            "Select pages to translate:",
-            page_options,
-            default=page_options[0] if page_options else None  # Default to first page if available
-        )
-        
-        # Convert selected pages to page numbers (0-indexed)
-        st.session_state.selected_pages = [int(page.split()[-1]) - 1 for page in selected_pages]
-    else:
-        # All pages
-        st.session_state.selected_pages = list(range(pdf_info['num_pages']))
+    # Options are a fragment, changing them does not rerun the whole script
+    translation_options(pdf_info['num_pages'])
+    render_dpi = st.session_state.render_dpi
+    max_image_size = st.session_state.max_image_size
+    batch_size = st.session_state.batch_size
+    concurrency = st.session_state.concurrency
+    detect_text_layer = st.session_state.detect_text_layer
     
     # Direct Image Translation button
-    if st.button("Translate PDF Pages Directly"):
+    if st.button("Translate PDF Pages Directly", disabled=same_lang):
         if validate_api_key():
             if not st.session_state.selected_pages:
                 st.warning("Please select at least one page to translate.")
             else:
                 with st.spinner("Converting PDF pages to images and translating..."):
+                    from pdf_utils import get_text_layer_pages, chunk_text, iter_render_pdf_pages
+                    from translation import (iter_translate_chunks, iter_translate_pdf_pages, is_translation_error,
+                                             get_translation_cache_salt, get_translation_prompt,
+                                             get_image_translation_prompt)
+                    
+                    # Connections of this run, closed however the run ends
+                    store = page_cache = None
                     try:
-                        # Reset previous translations
-                        st.session_state.translated_text = ""
-                        st.session_state.page_translations = {}
-                        st.session_state.page_images = {}
+                        # Pages translated successfully in a previous run are reused
+                        store = open_translation_store(st.session_state.file_hash)
+                        run_translations = load_page_translations(
+                            store, source_lang, target_lang, st.session_state.selected_pages, include_failed=False
+                        )
+                        pending_pages = [page_num for page_num in st.session_state.selected_pages if page_num not in run_translations]
+                        if run_translations:
+                            st.info(f"Resuming: {len(run_translations)} of {len(st.session_state.selected_pages)} pages already translated")
                         
-                        # Open PDF with PyMuPDF
+                        # getvalue() returns the upload's own buffer without copying it,
+                        # while getbuffer() would pin the buffer and make later reads copy
                         pdf_bytes = st.session_state.uploaded_file.getvalue()
-                        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
                         
-                        selected_images = []
-                        for page_num in st.session_state.selected_pages:
-                            # Get page
-                            page = pdf_document[page_num]
-                            # Convert page to image
-                            pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
-                            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                            selected_images.append((page_num, img))
-                        
-                        # Close PDF document
-                        pdf_document.close()
-                        
-                        # Clear PDF from memory
-                        st.session_state.uploaded_file = None
-                        pdf_bytes = None
+                        # Pages with an embedded text layer skip rasterization entirely
+                        text_pages = {}
+                        if detect_text_layer and pending_pages:
+                            text_pages = get_text_layer_pages(pdf_bytes, pending_pages)
+                        image_page_nums = [page_num for page_num in pending_pages if page_num not in text_pages]
                         
                         # Create a progress bar
                         progress_bar = st.progress(0)
                         status_text = st.empty()
+                        total_pages = len(st.session_state.selected_pages)
                         
-                        # Callback function to update progress
-                        def update_progress(current, total):
-                            progress = current / total
-                            progress_bar.progress(progress)
-                            status_text.text(f"Translating page {current} of {total}...")
+                        # Translated pages are shown here as soon as they complete
+                        live_translation = st.empty()
                         
-                        # Prepare the images list for translation
-                        img_list = [img for _, img in selected_images]
+                        # Store a finished page and refresh the progress and live view. Refreshes
+                        # are throttled, each one sends the whole live text to the browser.
+                        last_update = [0.0]
                         
-                        # Translate the images
-                        try:
-                            # Pass the images directly to Gemini for translation
-                            translated_pages = translate_pdf_pages(img_list, callback=update_progress, source_lang=source_lang, target_lang=target_lang)
+                        # Cached pages are only reused while the model, prompt and
+                        # generation settings they were translated with stay the same
+                        page_cache = open_page_cache()
+                        text_salt = get_translation_cache_salt(get_translation_prompt(source_lang, target_lang))
+                        image_salt = get_translation_cache_salt(get_image_translation_prompt(source_lang, target_lang))
+                        
+                        def page_completed(page_num, text, failed=False, page_hash=None):
+                            failed = failed or is_translation_error(text)
+                            save_page_translation(store, page_num, source_lang, target_lang, text, failed=failed)
+                            # Successful translations are shared with every upload containing the page
+                            if page_hash and not failed:
+                                save_cached_translation(page_cache, page_hash, source_lang, target_lang, text)
+                            run_translations[page_num] = text
+                            current = len(run_translations)
+                            now = time.monotonic()
+                            if now - last_update[0] < PROGRESS_UPDATE_INTERVAL and current < total_pages:
+                                return
+                            last_update[0] = now
+                            progress_bar.progress(current / total_pages)
+                            status_text.text(f"Translated page {current} of {total_pages}...")
+                            live_translation.text(combine_page_translations(run_translations))
+                        
+                        # Translate the born-digital pages from their text. Long pages are
+                        # chunked on their own so chunks never span a page boundary.
+                        chunk_page_nums = []
+                        page_chunks = []
+                        chunk_indices = {}
+                        text_page_hashes = {}
+                        for page_num, page_text in text_pages.items():
+                            page_hash = content_hash(page_text.encode(), text_salt)
+                            cached = load_cached_translation(page_cache, page_hash, source_lang, target_lang)
+                            if cached is not None:
+                                page_completed(page_num, cached)
+                                continue
                             
-                            # After translation, we can clear the images to free up memory
-                            for i, (page_num, img) in enumerate(selected_images):
-                                if i < len(translated_pages):
-                                    # Store translation text in session state
-                                    st.session_state.page_translations[page_num] = translated_pages[i]
-                                    # We don't need to keep the image in memory, 
-                                    # but we'll store a thumbnail for display purposes
-                                    thumb_size = (100, int(100 * img.height / img.width))
-                                    st.session_state.page_images[page_num] = img.resize(thumb_size)
+                            text_page_hashes[page_num] = page_hash
+                            for chunk in chunk_text(page_text):
+                                chunk_indices.setdefault(page_num, []).append(len(page_chunks))
+                                chunk_page_nums.append(page_num)
+                                page_chunks.append(chunk)
+                        
+                        translated_chunks = {}
+                        for i, translated_text in iter_translate_chunks(
+                            page_chunks, source_lang=source_lang, target_lang=target_lang,
+                            concurrency=concurrency
+                        ):
+                            translated_chunks[i] = translated_text
+                            page_num = chunk_page_nums[i]
                             
-                            # Now we can clear the original image list
-                            selected_images = None
-                            img_list = None
+                            # A page is finished once all of its chunks are back
+                            if all(j in translated_chunks for j in chunk_indices[page_num]):
+                                page_translations = [translated_chunks[j] for j in chunk_indices[page_num]]
+                                failed = any(is_translation_error(text) for text in page_translations)
+                                page_completed(page_num, "\n\n".join(page_translations), failed=failed,
+                                               page_hash=text_page_hashes[page_num])
+                        
+                        # Translate the remaining pages as images. Pages are rendered in
+                        # parallel and streamed to Gemini as JPEG bytes while the rest are
+                        # still rendering; each image is dropped once it has been translated.
+                        # Pages seen in an earlier upload are taken from the shared cache.
+                        rendered_page_nums = []
+                        rendered_page_hashes = []
+                        
+                        def rendered_images():
+                            if not image_page_nums:
+                                return
+                            for page_num, jpeg_bytes in iter_render_pdf_pages(
+                                pdf_bytes, image_page_nums, render_dpi, max_image_size
+                            ):
+                                page_hash = content_hash(jpeg_bytes, image_salt)
+                                cached = load_cached_translation(page_cache, page_hash, source_lang, target_lang)
+                                if cached is not None:
+                                    page_completed(page_num, cached)
+                                    continue
+                                
+                                rendered_page_nums.append(page_num)
+                                rendered_page_hashes.append(page_hash)
+                                yield jpeg_bytes
+                        
+                        try:
+                            for i, translated_text in iter_translate_pdf_pages(
+                                rendered_images(), source_lang=source_lang, target_lang=target_lang,
+                                batch_size=batch_size, concurrency=concurrency
+                            ):
+                                page_completed(rendered_page_nums[i], translated_text,
+                                               page_hash=rendered_page_hashes[i])
                             
                         except Exception as e:
                             st.error(f"Error during translation: {str(e)}")
-                            # Create an empty list to avoid errors below
-                            translated_pages = ["Error translating page."] * len(img_list)
                             
-                            # Store error translations in session state
-                            for i, (page_num, _) in enumerate(selected_images):
-                                if i < len(translated_pages):
-                                    st.session_state.page_translations[page_num] = translated_pages[i]
+                            # Store error translations for pages that did not complete
+                            for page_num in image_page_nums:
+                                if page_num not in run_translations:
+                                    save_page_translation(store, page_num, source_lang, target_lang,
+                                                          "Error translating page.", failed=True)
                         
-                        # Storage of translations is now done during translation in the try block
-                        # We now only need to combine them to show the results
-                        
-                        # Combine all translated texts
-                        combined_translation = "\n\n".join([
-                            f"--- Page {page_num + 1} ---\n{text}"
-                            for page_num, text in sorted(st.session_state.page_translations.items())
-                        ])
+                        # The full result is shown below, drop the live view
+                        live_translation.empty()
+                        run_translations = None
                         
                         # Update session state
-                        st.session_state.translated_text = combined_translation
+                        st.session_state.translation_request = (
+                            list(st.session_state.selected_pages), source_lang, target_lang
+                        )
                         st.session_state.translation_completed = True
                         
                         # Update the progress bar to 100%
@@ -325,20 +509,37 @@ if st.session_state.uploaded_file is not None and st.session_state.pdf_info is n
                     except Exception as e:
                         st.error(f"❌ Translation error: {str(e)}")
                         st.error("Make sure you are using the latest version of the Gemini API key.")
+                    finally:
+                        for conn in (store, page_cache):
+                            if conn is not None:
+                                conn.close()
     
     # Display translated text if available
-    if st.session_state.translation_completed and st.session_state.translated_text:
+    translated_text = ""
+    if st.session_state.translation_completed:
+        # Translations are read back from the on-disk store
+        translated_pages, translated_source, translated_target = st.session_state.translation_request
+        with closing(open_translation_store(st.session_state.file_hash)) as store:
+            translated_text = combine_page_translations(
+                load_page_translations(store, translated_source, translated_target, translated_pages)
+            )
+    
+    if translated_text:
         st.write("---")
         st.subheader("🔤 Translation Results")
         
-        st.text_area("Translated Text", st.session_state.translated_text, height=400)
+        st.text_area("Translated Text", translated_text, height=400)
+        
+        # Previews are rendered only while shown and only for PDFs
+        if (uploaded_file is not None and uploaded_file.name.lower().endswith('.pdf')
+                and st.checkbox("Show page previews")):
+            preview_pages = tuple(sorted(translated_pages))
+            thumbnails = get_page_thumbnails(st.session_state.file_hash, preview_pages, uploaded_file.getvalue())
+            # A single image element lays the previews out as a gallery
+            st.image(thumbnails, caption=[f"Page {page_num + 1}" for page_num in preview_pages])
         
         # Create a download button for the translated text
-        if st.session_state.translated_text:
-            # Create a text file with the translated text
-            translated_text_bytes = st.session_state.translated_text.encode()
-            bio = io.BytesIO(translated_text_bytes)
-            
+        if translated_text:
             # Generate a filename for the download
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             
@@ -349,10 +550,10 @@ if st.session_state.uploaded_file is not None and st.session_state.pdf_info is n
             else:
                 download_filename = f"translated_document_{timestamp}.txt"
             
-            # Display the download button
+            # Display the download button, Streamlit encodes the text once itself
             st.download_button(
                 label="Download Translated Text",
-                data=bio,
+                data=translated_text,
                 file_name=download_filename,
                 mime="text/plain"
             )
@@ -1,26 +1,25 @@
-import fitz
-from PIL import Image
-import docx2txt
 import io
 from typing import Dict, Any
 
 def process_pdf_file(file) -> Dict[str, Any]:
     """Process PDF file and return info."""
-    pdf_bytes = file.getvalue()
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    from pdf_utils import open_pdf
     
-    info = {
-        "num_pages": len(doc),
-        "metadata": doc.metadata,
-        "file_size": len(pdf_bytes) / 1024,  # Size in KB
-        "file_type": "pdf"
-    }
+    pdf_bytes = file.getvalue()
+    with open_pdf(pdf_bytes) as doc:
+        info = {
+            "num_pages": len(doc),
+            "metadata": doc.metadata,
+            "file_size": len(pdf_bytes) / 1024,  # Size in KB
+            "file_type": "pdf"
+        }
     
-    doc.close()
     return info
 
 def process_image_file(file) -> Dict[str, Any]:
     """Process image file and return info."""
+    from PIL import Image
+    
     img_bytes = file.getvalue()
     img = Image.open(io.BytesIO(img_bytes))
     
@@ -39,6 +38,8 @@ def process_image_file(file) -> Dict[str, Any]:
 
 def process_docx_file(file) -> Dict[str, Any]:
     """Process DOCX file and return info."""
+    import docx2txt
+    
     docx_bytes = file.getvalue()
     text = docx2txt.process(io.BytesIO(docx_bytes))
     
@@ -56,3 +57,12 @@ def process_docx_file(file) -> Dict[str, Any]:
     }
     
     return info
+
+# File info handlers by file extension
+FILE_PROCESSORS = {
+    "pdf": process_pdf_file,
+    "docx": process_docx_file,
+    "png": process_image_file,
+    "jpg": process_image_file,
+    "jpeg": process_image_file,
+}
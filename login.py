@@ -1,45 +1,88 @@
 import streamlit as st
+import hashlib
+import hmac
 import json
+import os
 from pathlib import Path
 
+CREDENTIALS_FILE = Path(__file__).parent / "credentials.json"
+
+# PBKDF2 iterations used to hash stored passwords
+PASSWORD_HASH_ITERATIONS = 600_000
+
+# Parsed credentials, users by name and the modification time of the file they were read from
+_credentials_cache = {"mtime": None, "data": None, "users": None}
+
+def hash_password(password: str, salt: bytes) -> str:
+    """Hash a password with the given salt."""
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, PASSWORD_HASH_ITERATIONS).hex()
+
 def load_credentials() -> dict:
-    """Load credentials from the JSON file."""
-    credentials_file = Path(__file__).parent / "credentials.json"
-    
-    # Create default credentials if file doesn't exist
-    if not credentials_file.exists():
+    """Load credentials from the JSON file, reusing them until the file changes."""
+    # A single stat both detects changes and a missing file
+    try:
+        mtime = CREDENTIALS_FILE.stat().st_mtime_ns
+    except FileNotFoundError:
+        # Create default credentials if file doesn't exist
         default_credentials = {"users": []}
-        with open(credentials_file, "w") as f:
+        with open(CREDENTIALS_FILE, "w") as f:
             json.dump(default_credentials, f, indent=4)
+        mtime = CREDENTIALS_FILE.stat().st_mtime_ns
+    
+    if _credentials_cache["mtime"] != mtime:
+        # Load credentials, decoding the whole file in one call
+        _credentials_cache["data"] = json.loads(CREDENTIALS_FILE.read_bytes())
+        _credentials_cache["users"] = {user["username"]: user for user in _credentials_cache["data"]["users"]}
+        _credentials_cache["mtime"] = mtime
     
-    # Load credentials
-    with open(credentials_file) as f:
-        return json.load(f)
+    return _credentials_cache["data"]
+
+def load_users() -> dict:
+    """Load the registered users, keyed by username."""
+    load_credentials()
+    return _credentials_cache["users"]
 
 def save_credentials(credentials: dict) -> None:
     """Save credentials to the JSON file."""
-    credentials_file = Path(__file__).parent / "credentials.json"
-    with open(credentials_file, "w") as f:
+    with open(CREDENTIALS_FILE, "w") as f:
         json.dump(credentials, f, indent=4)
+    
+    _credentials_cache["data"] = credentials
+    _credentials_cache["users"] = {user["username"]: user for user in credentials["users"]}
+    _credentials_cache["mtime"] = CREDENTIALS_FILE.stat().st_mtime_ns
 
 def check_credentials(username: str, password: str) -> bool:
     """Verify user credentials."""
-    credentials = load_credentials()
-    return any(
-        user["username"] == username and user["password"] == password
-        for user in credentials["users"]
-    )
+    user = load_users().get(username)
+    if user is None:
+        return False
+    
+    if "hash" in user:
+        password_hash = hash_password(password, bytes.fromhex(user["salt"]))
+        return hmac.compare_digest(password_hash, user["hash"])
+    
+    # Accounts registered before passwords were hashed store them in plain text,
+    # they are upgraded to a hash on their first successful login
+    if not hmac.compare_digest(user["password"].encode(), password.encode()):
+        return False
+    salt = os.urandom(16)
+    user["salt"] = salt.hex()
+    user["hash"] = hash_password(password, salt)
+    del user["password"]
+    save_credentials(load_credentials())
+    return True
 
 def register_user(username: str, password: str) -> bool:
     """Register a new user."""
     credentials = load_credentials()
     
     # Check if username already exists
-    if any(user["username"] == username for user in credentials["users"]):
+    if username in load_users():
         return False  # Username already exists
     
     # Add new user
-    credentials["users"].append({"username": username, "password": password})
+    salt = os.urandom(16)
+    credentials["users"].append({"username": username, "salt": salt.hex(), "hash": hash_password(password, salt)})
     save_credentials(credentials)
     return True
 
@@ -1,60 +1,250 @@
-import PyPDF2
 import io
+import os
 import re
+import hashlib
+import sqlite3
+import statistics
+import tempfile
+import threading
 import fitz  # PyMuPDF
-from typing import List, Tuple, Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing, contextmanager
+from typing import List, Tuple, Dict, Optional, Iterator
 from PIL import Image
 import pytesseract
+from translation_store import open_ocr_cache, save_cached_ocr, load_cached_ocr
 
-def extract_text_from_pdf(pdf_file) -> Tuple[str, int]:
-    """Extract text from a PDF file using PyMuPDF."""
+# PDF document opened once per rendering worker process
+_worker_doc = None
+
+# Parsed PDF documents kept open for reuse, keyed by content hash
+_pdf_cache: "OrderedDict[str, fitz.Document]" = OrderedDict()
+_pdf_cache_lock = threading.RLock()
+
+# JPEG quality of rendered pages sent to the translation model
+JPEG_QUALITY = 85
+
+# Pages whose text layer has at least this many characters skip image translation
+MIN_TEXT_LAYER_CHARS = 200
+
+# Pages whose embedded text is shorter than this, or mostly unmapped glyphs, are OCR'd
+MIN_EXTRACTED_TEXT_CHARS = 50
+
+# Number of parsed PDF documents kept open between calls
+PDF_CACHE_SIZE = 2
+
+# Pages rendered and OCR'd together by one tesseract run
+OCR_BATCH_PAGES = 8
+
+# Resolution for page OCR when the text size of a page is not measured
+OCR_DPI = 300
+
+# Resolution at which the text line height of a page is measured
+OCR_PROBE_DPI = 150
+
+# Height in pixels of the dense band of a text line (its x-height) that
+# Tesseract reads best, which 12pt text reaches at about 300 DPI
+OCR_TARGET_LINE_HEIGHT = 25
+
+# Bounds of the resolution chosen from the measured line height. Pages are
+# rendered again at the upper bound when OCR gave no clean result.
+OCR_MIN_DPI = 200
+OCR_ADAPTIVE_MAX_DPI = 450
+
+# Minimum drop in a row's mean brightness below the page background that
+# marks it as part of a text line
+_INK_ROW_CONTRAST = 4
+
+# Blank rows inside a text line (gaps between diacritics and letters) that
+# are closed before measuring it
+_MAX_LINE_GAP_ROWS = 2
+
+# Bands taller than this, in probe pixels, are figures or filled boxes
+# rather than text, it is the x-height of a 72pt heading
+_MAX_LINE_HEIGHT = OCR_PROBE_DPI // 2
+
+# OCR passes recognizing at least this many Arabic characters are not retried
+MIN_GOOD_OCR_ARABIC_CHARS = 200
+
+# OCR passes reading at least this many letters, nearly none of them Arabic, are not retried
+MIN_GOOD_OCR_OTHER_LETTERS = 200
+
+# Placeholders emitted for glyphs that have no Unicode mapping in the PDF font
+_UNMAPPED_GLYPH_RE = re.compile(r'\(cid:\d+\)|\ufffd')
+
+# Extended Unicode ranges for Arabic special characters and symbols
+_SPECIAL_ARABIC_RANGES = [
+    (0x0600, 0x06FF),   # Arabic
+    (0xFB50, 0xFDFF),   # Arabic Presentation Forms-A
+    (0xFE70, 0xFEFF),   # Arabic Presentation Forms-B
+    (0x0750, 0x077F),   # Arabic Supplement
+    (0x08A0, 0x08FF),   # Arabic Extended-A
+    (0x0870, 0x089F),   # Arabic Extended-B
+    (0x0890, 0x08FF),   # Arabic Extended-C
+    (0x10E60, 0x10E7F), # Rumi Numeral Symbols
+    (0x1EE00, 0x1EEFF), # Arabic Mathematical Alphabetic Symbols
+    (0x06E0, 0x06FF),   # Arabic Extended-B (additional)
+    (0xFDF0, 0xFDFF),   # Arabic Ligatures
+]
+_SPECIAL_ARABIC_CODES = frozenset(
+    code for start, end in _SPECIAL_ARABIC_RANGES for code in range(start, end + 1)
+)
+_SPECIAL_ARABIC_DELETE_TABLE = dict.fromkeys(_SPECIAL_ARABIC_CODES)
+
+# Arabic ligature mappings
+_ARABIC_LIGATURES = {
+    # لا family
+    'ﻻ': 'لا',
+}
+
+# Common word patterns that might be misrecognized
+_COMMON_WORD_PATTERNS = [(re.compile(pattern), correct) for pattern, correct in {
+    r'اﻟ+': 'ال',  # Fix elongated lam in al-
+    r'ﷲ': 'الله',  # Fix Allah word
+    r'ﻣﺤﻤ[ﺪﺩدﺪﺩ]': 'محمد',  # Fix Muhammad name
+    r'ﻋﺒ[ﺪﺩدﺪﺩ]': 'عبد',  # Fix Abd
+    r'اﻟ?ﺮﺣﻤ[ﻦﻥن]': 'الرحمن',  # Fix Al-Rahman
+    r'اﻟ?ﺮﺣ[ﻴﻳيﯾ]?[ﻢﻣم]': 'الرحيم',  # Fix Al-Raheem
+}.items()]
+
+# Common religious phrases that might be misrecognized
+_RELIGIOUS_PHRASE_PATTERNS = [(re.compile(pattern), correct) for pattern, correct in {
+    r'صل[ىي]\s*[اآ]لله\s*عل[يى]ه\s*[وﻭ]سلم': 'صلى الله عليه وسلم',
+}.items()]
+
+# Common letter mistakes
+_LETTER_FIXES = {
+    'ھ': 'ه',    # Fix different forms of Ha
+}
+
+# Arabic numbers and their Western equivalents
+_ARABIC_NUMBERS = {
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+}
+
+# Enhanced Quranic symbols and markers, kept apart with spacing
+_QURANIC_SYMBOLS = {
+    '۝': ' ۝ ',    # Sajdah
+}
+
+# Diacritical marks and special characters
+_DIACRITICS = {
+    'ٰ': 'ٰ',     # Superscript alef
+}
+
+# Connected letters only need the tatweel (kashida) between them removed
+_TATWEEL = 'ـ'
+
+# Single-character fixes are applied in one pass each with str.translate
+_OCR_LETTER_TABLE = str.maketrans({**_ARABIC_LIGATURES, **_LETTER_FIXES})
+_OCR_SYMBOL_TABLE = str.maketrans({**_QURANIC_SYMBOLS, **_ARABIC_NUMBERS, **_DIACRITICS, _TATWEEL: None})
+
+# Every common word pattern contains a presentation form, text without any is skipped
+_PRESENTATION_FORM_RE = re.compile('[\uFB50-\uFDFF\uFE70-\uFEFF]')
+
+# Places to split an oversized paragraph at, in order of preference. The
+# separator stays at the end of the preceding piece.
+_PARAGRAPH_SPLIT_PATTERNS = [re.compile(r'(?<=\n)'), re.compile(r'(?<=[.!?\u061F\u06D4]\s)')]
+
+def read_pdf_bytes(pdf_file) -> bytes:
+    """Get the content of an uploaded PDF file object, or return raw PDF bytes as they are."""
+    if isinstance(pdf_file, bytes):
+        return pdf_file
+    # getvalue() shares an uploaded file's buffer, read() copies it
+    return pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
+
+@contextmanager
+def open_pdf(pdf_bytes: bytes) -> Iterator[fitz.Document]:
+    """
+    Open a PDF, reusing the parsed document of a previous call on the same content.
+    
+    Getting the file info, checking text layers and rendering previews all
+    work on the same upload, so its xref table and page tree are parsed once.
+    PyMuPDF documents are not thread-safe, so the document is only used while
+    holding a lock shared by all Streamlit sessions; it must not be closed by
+    the caller.
+    
+    Args:
+        pdf_bytes: The raw PDF content
+    
+    Returns:
+        Context manager yielding the open document
+    """
+    key = hashlib.blake2b(pdf_bytes, digest_size=8).hexdigest()
+    with _pdf_cache_lock:
+        doc = _pdf_cache.pop(key, None)
+        if doc is None:
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        _pdf_cache[key] = doc
+        while len(_pdf_cache) > PDF_CACHE_SIZE:
+            _pdf_cache.popitem(last=False)[1].close()
+        yield doc
+
+def iter_pdf_text(pdf_file) -> Iterator[Tuple[int, str]]:
+    """
+    Extract the text of a PDF file page by page using PyMuPDF.
+    
+    Pages with usable embedded text are yielded first, in page order, and
+    only pages that need OCR (no text, very little, or unmapped glyphs) follow
+    as their worker finishes, so callers can start on the text without
+    waiting for OCR or building one string for the whole file.
+    
+    Args:
+        pdf_file: The uploaded PDF file object or the raw PDF bytes
+    
+    Returns:
+        Iterator of (page number, page text) tuples, page numbers 0-indexed
+    """
     try:
-        pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
+        pdf_bytes = read_pdf_bytes(pdf_file)
         
-        for page in doc:
-            # Get text directly from PDF
-            page_text = page.get_text()
-            
-            # If no text found, try OCR
-            if not page_text.strip():
-                pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                page_text = pytesseract.image_to_string(img, lang='ara+ita')
-            
-            text += page_text + "\n\n"
+        # Get text directly from PDF
+        with open_pdf(pdf_bytes) as doc:
+            page_texts = [page.get_text() for page in doc]
         
-        return text, len(doc)
+        ocr_page_nums = []
+        for page_num, page_text in enumerate(page_texts):
+            if has_text_layer(page_text, MIN_EXTRACTED_TEXT_CHARS):
+                yield page_num, page_text
+            else:
+                ocr_page_nums.append(page_num)
+        page_texts = None
+        
+        # If no text found, try OCR. Pages are OCR'd in batches by one
+        # single-threaded worker process per core, each batch in one tesseract
+        # run. Bounded batches keep at most a few rendered pages per worker on
+        # disk, and rendering in one worker overlaps OCR in the others.
+        if ocr_page_nums:
+            shards = [ocr_page_nums[i:i + OCR_BATCH_PAGES] for i in range(0, len(ocr_page_nums), OCR_BATCH_PAGES)]
+            max_workers = max(1, min(os.cpu_count() or 1, len(shards)))
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_ocr_worker,
+                                     initargs=(pdf_bytes,)) as executor:
+                futures = {executor.submit(_ocr_pages_worker, shard): shard for shard in shards}
+                for future in as_completed(futures):
+                    yield from zip(futures[future], future.result())
             
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
+def extract_text_from_pdf(pdf_file) -> Tuple[str, int]:
+    """Extract text from a PDF file using PyMuPDF."""
+    page_texts = dict(iter_pdf_text(pdf_file))
+    return "".join(page_texts[page_num] + "\n\n" for page_num in range(len(page_texts))), len(page_texts)
+
 def extract_text_from_pdf_page(pdf_file, page_num: int) -> str:
     """
     Extract text from a specific page of a PDF file using OCR.
     
     Args:
-        pdf_file: The uploaded PDF file object
+        pdf_file: The uploaded PDF file object or the raw PDF bytes
         page_num: The page number to extract (0-indexed)
     
     Returns:
         Extracted text from the specified page
     """
     try:
-        # Read PDF bytes
-        pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
-        
-        # Convert specific PDF page to image with high DPI for better symbol recognition
-        images = convert_from_bytes(pdf_bytes, first_page=page_num+1, last_page=page_num+1, dpi=600)
-        
-        if not images:
-            raise ValueError(f"Failed to convert page {page_num+1} to image.")
-        
-        # Enhanced image preprocessing
-        image = images[0]
-        img_gray = image.convert('L')  # Grayscale
-        img_binary = img_gray.point(lambda x: 0 if x < 128 else 255, '1')  # Binary
+        pdf_bytes = read_pdf_bytes(pdf_file)
         
         extracted_texts = []
         
@@ -72,164 +262,366 @@ def extract_text_from_pdf_page(pdf_file, page_num: int) -> str:
             }
         ]
         
-        for config in ocr_configs:
-            try:
-                text = pytesseract.image_to_string(
-                    img_binary if 'binary' in config.get('config', '') else img_gray,
-                    lang=config['lang'],
-                    config=config['config']
-                )
-                extracted_texts.append(text)
-            except Exception as e:
-                print(f"OCR pass failed: {str(e)}")
-                continue
-        
-        # Post-processing to handle special cases
+        # Post-processing to handle special cases, the pass that recognized
+        # the most special Arabic characters wins
         final_text = ""
-        for text in extracted_texts:
-            text = fix_arabic_ocr_errors(text)
-            if len([c for c in text if is_special_arabic_char(c)]) > len([c for c in final_text if is_special_arabic_char(c)]):
-                final_text = text
+        final_count = 0
+        good_result = False
+        
+        # Start at the resolution that suits the page's text size and only
+        # render again at the upper bound, for small print and symbols, when
+        # no pass was clean and the first render was below it
+        with open_pdf(pdf_bytes) as doc:
+            if not 0 <= page_num < len(doc):
+                raise ValueError(f"Failed to convert page {page_num+1} to image.")
+            ocr_dpis = [_estimate_ocr_dpi(doc[page_num])]
+        if ocr_dpis[0] < OCR_ADAPTIVE_MAX_DPI:
+            ocr_dpis.append(OCR_ADAPTIVE_MAX_DPI)
+        
+        for dpi in ocr_dpis:
+            # PyMuPDF renders in-process, avoiding a Poppler subprocess per page.
+            with open_pdf(pdf_bytes) as doc:
+                # OCR needs no color, a grayscale render is a third of the size
+                pix = doc[page_num].get_pixmap(matrix=fitz.Matrix(dpi/72, dpi/72), colorspace=fitz.csGRAY)
+            
+            # Enhanced image preprocessing. Tesseract binarizes internally (Otsu),
+            # so every pass reads the grayscale image. It is written once as an
+            # uncompressed PGM file that all passes share, instead of pytesseract
+            # encoding a PNG for every pass.
+            with tempfile.TemporaryDirectory() as tmp_dir, closing(open_ocr_cache()) as cache:
+                image_path = os.path.join(tmp_dir, "page.pgm")
+                image_hash = _pixmap_hash(pix)
+                pix.save(image_path)
+                pix = None
+                
+                for config in ocr_configs:
+                    try:
+                        text = _cached_image_to_string(
+                            cache,
+                            image_path,
+                            image_hash,
+                            lang=config['lang'],
+                            config=config['config']
+                        )
+                        extracted_texts.append(text)
+                    except Exception as e:
+                        print(f"OCR pass failed: {str(e)}")
+                        continue
+                    
+                    text = fix_arabic_ocr_errors(text)
+                    count = count_special_arabic_chars(text)
+                    if count > final_count:
+                        final_text, final_count = text, count
+                    
+                    # A clean Arabic page needs no further passes
+                    if is_good_arabic_ocr(text, count):
+                        good_result = True
+                        break
+                    
+                    # Neither does a page in another script, which the
+                    # Arabic-only pass and a sharper render cannot read better
+                    if is_good_non_arabic_ocr(text, count):
+                        final_text = text
+                        good_result = True
+                        break
+            
+            if good_result:
+                break
         
         return final_text or extracted_texts[0] if extracted_texts else ""
             
     except Exception as e:
         raise Exception(f"Error extracting text from PDF page {page_num+1}: {str(e)}")
 
+def _estimate_ocr_dpi(page: fitz.Page) -> int:
+    """
+    Pick the OCR resolution that renders a page's text lines at the height Tesseract reads best.
+    
+    Text lines are found in a low-resolution render as runs of rows darker
+    than the page background. Shrinking the page to a single column averages
+    every row in C. A line's height is the number of its rows that are at
+    least half as dark as its darkest row, which measures the dense band of
+    the line (its x-height) regardless of how long the line is or how dark
+    the print is.
+    
+    Args:
+        page: The PDF page to measure
+    
+    Returns:
+        Resolution in DPI, OCR_DPI if no text lines were found
+    """
+    zoom = OCR_PROBE_DPI / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+    image = Image.frombytes("L", [pix.width, pix.height], pix.samples_mv)
+    rows = image.resize((1, image.height), Image.BOX).tobytes()
+    background = max(rows)
+    darkness = [background - row for row in rows]
+    
+    # Find the runs of ink rows, closing small gaps inside a line
+    runs = []
+    start = end = None
+    for i, level in enumerate(darkness):
+        if level < _INK_ROW_CONTRAST:
+            continue
+        if start is not None and i - end > _MAX_LINE_GAP_ROWS + 1:
+            runs.append((start, end))
+            start = None
+        if start is None:
+            start = i
+        end = i
+    if start is not None:
+        runs.append((start, end))
+    
+    line_heights = []
+    for start, end in runs:
+        line = darkness[start:end + 1]
+        peak = max(line)
+        height = sum(1 for level in line if 2 * level >= peak)
+        # Runs of one or two rows are noise or rules, not text
+        if 2 < height <= _MAX_LINE_HEIGHT:
+            line_heights.append(height)
+    
+    if not line_heights:
+        return OCR_DPI
+    
+    # Drop bands far taller than a typical line, such as filled boxes
+    line_height = statistics.median(line_heights)
+    line_height = statistics.median(height for height in line_heights if height <= 3 * line_height)
+    dpi = round(OCR_PROBE_DPI * OCR_TARGET_LINE_HEIGHT / line_height)
+    return max(OCR_MIN_DPI, min(dpi, OCR_ADAPTIVE_MAX_DPI))
+
+def _limit_ocr_threads() -> None:
+    """Run tesseract single-threaded, as every OCR worker process already uses a core."""
+    # OpenMP threads of parallel tesseract runs would oversubscribe the cores
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 def is_special_arabic_char(char: str) -> bool:
     """Check if character is a special Arabic character or symbol."""
-    # Extended Unicode ranges for Arabic special characters and symbols
-    special_ranges = [
-        (0x0600, 0x06FF),   # Arabic
-        (0xFB50, 0xFDFF),   # Arabic Presentation Forms-A
-        (0xFE70, 0xFEFF),   # Arabic Presentation Forms-B
-        (0x0750, 0x077F),   # Arabic Supplement
-        (0x08A0, 0x08FF),   # Arabic Extended-A
-        (0x0870, 0x089F),   # Arabic Extended-B
-        (0x0890, 0x08FF),   # Arabic Extended-C
-        (0x10E60, 0x10E7F), # Rumi Numeral Symbols
-        (0x1EE00, 0x1EEFF), # Arabic Mathematical Alphabetic Symbols
-        (0x06E0, 0x06FF),   # Arabic Extended-B (additional)
-        (0xFDF0, 0xFDFF),   # Arabic Ligatures
-    ]
-    
     if not char:
         return False
     
-    code = ord(char)
-    return any(start <= code <= end for start, end in special_ranges)
+    return ord(char) in _SPECIAL_ARABIC_CODES
+
+def is_good_arabic_ocr(text: str, special_count: int) -> bool:
+    """Check whether an OCR result already has enough Arabic to skip further passes."""
+    non_space_count = len(text) - sum(1 for c in text if c.isspace())
+    return special_count >= MIN_GOOD_OCR_ARABIC_CHARS or special_count > non_space_count / 2
+
+def is_good_non_arabic_ocr(text: str, special_count: int) -> bool:
+    """Check whether an OCR result is already substantial text in a script other than Arabic."""
+    letter_count = sum(1 for c in text if c.isalpha())
+    return letter_count >= MIN_GOOD_OCR_OTHER_LETTERS and special_count < letter_count / 10
+
+def count_special_arabic_chars(text: str) -> int:
+    """Count the special Arabic characters and symbols in a text."""
+    # Deleting them with str.translate counts in a single pass in C
+    return len(text) - len(text.translate(_SPECIAL_ARABIC_DELETE_TABLE))
 
 def fix_arabic_ocr_errors(text: str) -> str:
     """Fix common OCR errors in Arabic text."""
-    # Add new Arabic ligature mappings
-    arabic_ligatures = {
-        # لا family
-        'ﻻ': 'لا',
-        
-    }
-    
-    # Add common word patterns that might be misrecognized
-    common_word_patterns = {
-        r'اﻟ+': 'ال',  # Fix elongated lam in al-
-        r'ﷲ': 'الله',  # Fix Allah word
-        r'ﻣﺤﻤ[ﺪﺩدﺪﺩ]': 'محمد',  # Fix Muhammad name
-        r'ﻋﺒ[ﺪﺩدﺪﺩ]': 'عبد',  # Fix Abd
-        r'اﻟ?ﺮﺣﻤ[ﻦﻥن]': 'الرحمن',  # Fix Al-Rahman
-        r'اﻟ?ﺮﺣ[ﻴﻳيﯾ]?[ﻢﻣم]': 'الرحيم',  # Fix Al-Raheem
-    }
-
-    # Apply ligature fixes before existing fixes
-    for wrong, correct in arabic_ligatures.items():
-        text = text.replace(wrong, correct)
+    # Apply ligature and letter fixes before the pattern fixes
+    text = text.translate(_OCR_LETTER_TABLE)
     
     # Apply common word pattern fixes
-    import re
-    for pattern, correct in common_word_patterns.items():
-        text = re.sub(pattern, correct, text)
-    
-    # Continue with existing fixes
-    # Common religious phrases that might be misrecognized
-    religious_phrases = {
-        r'صل[ىي]\s*[اآ]لله\s*عل[يى]ه\s*[وﻭ]سلم': 'صلى الله عليه وسلم',
-       
-    }
-    
-    # Fix common letter mistakes
-    letter_fixes = {
-        'ھ': 'ه',    # Fix different forms of Ha
-       
-    }
-    
-    # Arabic numbers and their Western equivalents
-    arabic_numbers = {
-        '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
-      
-    }
-    
-    # Enhanced Quranic symbols and markers
-    quranic_symbols = {
-        '۝': '۝',    # Sajdah
-       
-    }
-    
-    # Diacritical marks and special characters
-    diacritics = {
-        'ٰ': 'ٰ',     # Superscript alef
-     
-    }
-
-    # Apply all fixes
-    for wrong, correct in letter_fixes.items():
-        text = text.replace(wrong, correct)
+    if _PRESENTATION_FORM_RE.search(text):
+        for pattern, correct in _COMMON_WORD_PATTERNS:
+            text = pattern.sub(correct, text)
     
     # Fix religious phrases
-    import re
-    for pattern, correct in religious_phrases.items():
-        text = re.sub(pattern, correct, text)
-    
-    # Preserve Quranic symbols with spacing
-    for symbol, correct in quranic_symbols.items():
-        text = text.replace(symbol, f' {correct} ')
-    
-    # Preserve numbers while maintaining their style
-    numbers_pattern = re.compile('|'.join(map(re.escape, arabic_numbers.keys())))
-    text = numbers_pattern.sub(lambda m: arabic_numbers[m.group()], text)
-    
-    # Preserve diacritics
-    for mark, correct in diacritics.items():
-        text = text.replace(mark, correct)
-    
-    # Additional post-processing for connected letters
-    def fix_connected_letters(text: str) -> str:
-        # Fix common connected letter patterns
-        patterns = [
-            (r'ـ+', ''),  # Remove tatweel (kashida)
-            (r'([ءآأؤإئا])ـ+([ءآأؤإئا])', r'\1\2'),  # Fix alef connections
-            (r'([بتثجحخسشصضطظعغفقكلمنهي])ـ+([بتثجحخسشصضطظعغفقكلمنهي])', r'\1\2'),  # Fix normal letter connections
-        ]
+    for pattern, correct in _RELIGIOUS_PHRASE_PATTERNS:
+        text = pattern.sub(correct, text)
+    
+    # Preserve Quranic symbols with spacing, numbers and diacritics, and
+    # remove tatweel between connected letters
+    return text.translate(_OCR_SYMBOL_TABLE)
+
+def _init_render_worker(pdf_bytes: bytes) -> None:
+    """Open the PDF once in each rendering worker process."""
+    global _worker_doc
+    _worker_doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+def _init_ocr_worker(pdf_bytes: bytes) -> None:
+    """Open the PDF once in each batch OCR worker process."""
+    _limit_ocr_threads()
+    _init_render_worker(pdf_bytes)
+
+def _ocr_pages_worker(page_nums: List[int]) -> List[str]:
+    """OCR several pages of the worker's PDF with a single tesseract run."""
+    with tempfile.TemporaryDirectory() as tmp_dir, closing(open_ocr_cache()) as cache:
+        page_texts = {}
+        image_paths = {}
+        image_hashes = {}
+        for page_num in page_nums:
+            # Plain page text needs no escalation, OCR_DPI is enough
+            zoom = OCR_DPI / 72
+            pix = _worker_doc[page_num].get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY)
+            
+            # Pages seen before, in this file or another, are not OCR'd again
+            image_hash = _pixmap_hash(pix)
+            cached_text = load_cached_ocr(cache, image_hash, 'ara+ita', '')
+            if cached_text is not None:
+                page_texts[page_num] = cached_text
+                continue
+            
+            image_path = os.path.join(tmp_dir, f"{page_num}.png")
+            pix.save(image_path)
+            image_paths[page_num] = image_path
+            image_hashes[page_num] = image_hash
         
-        for pattern, replacement in patterns:
-            text = re.sub(pattern, replacement)
-        return text
+        if image_paths:
+            ocr_texts = _ocr_images_batch(list(image_paths.values()), tmp_dir)
+            for page_num, page_text in zip(image_paths, ocr_texts):
+                page_texts[page_num] = page_text
+                save_cached_ocr(cache, image_hashes[page_num], 'ara+ita', '', page_text)
+        
+        return [page_texts[page_num] for page_num in page_nums]
+
+def _ocr_images_batch(image_paths: List[str], tmp_dir: str) -> List[str]:
+    """OCR several images with a single tesseract run."""
+    # Tesseract reads a text file as a list of images, one per line
+    list_path = os.path.join(tmp_dir, "pages.txt")
+    with open(list_path, "w") as list_file:
+        list_file.write("\n".join(image_paths) + "\n")
     
-    # Apply connected letter fixes
-    text = fix_connected_letters(text)
+    # Every page of the output ends with a form feed
+    page_texts = pytesseract.image_to_string(list_path, lang='ara+ita').split('\f')
+    if len(page_texts) >= len(image_paths):
+        return page_texts[:len(image_paths)]
     
+    print(f"OCR output could not be split into {len(image_paths)} pages, processing them individually")
+    return [pytesseract.image_to_string(image_path, lang='ara+ita') for image_path in image_paths]
+
+def _pixmap_hash(pix: fitz.Pixmap) -> str:
+    """Hash the size and pixels of a rendered page."""
+    pixmap_hash = hashlib.blake2b(f"{pix.width}x{pix.height}x{pix.n}".encode(), digest_size=16)
+    pixmap_hash.update(pix.samples_mv)
+    return pixmap_hash.hexdigest()
+
+def _cached_image_to_string(cache: sqlite3.Connection, image_path: str, image_hash: str,
+                            lang: str, config: str) -> str:
+    """OCR an image with tesseract, reusing the text of an identical image and configuration."""
+    text = load_cached_ocr(cache, image_hash, lang, config)
+    if text is None:
+        text = pytesseract.image_to_string(image_path, lang=lang, config=config)
+        save_cached_ocr(cache, image_hash, lang, config, text)
     return text
 
+def _render_page_worker(page_num: int, dpi: int, max_size: Optional[int]) -> bytes:
+    """Render a single page of the worker's PDF to JPEG bytes."""
+    page = _worker_doc[page_num]
+    
+    # Render directly at the size that fits within max_size, rather than
+    # rasterizing at full resolution and downscaling afterwards
+    zoom = dpi / 72
+    if max_size:
+        zoom = min(zoom, max_size / max(page.rect.width, page.rect.height))
+    
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    # Wrap the pixmap's buffer instead of copying it, PIL then encodes the JPEG
+    # several times faster than PyMuPDF's own pix.tobytes("jpeg")
+    img = Image.frombuffer("RGB", [pix.width, pix.height], pix.samples_mv, "raw", "RGB", 0, 1)
+    
+    # Encode in the worker so only compressed bytes cross the process boundary
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+def iter_render_pdf_pages(pdf_bytes: bytes, page_nums: List[int], dpi: int = 150,
+                          max_size: Optional[int] = None) -> Iterator[Tuple[int, bytes]]:
+    """
+    Render the selected PDF pages to JPEG images in parallel.
+    
+    PyMuPDF is not thread-safe, so pages are rendered in separate processes,
+    each holding its own copy of the document. Pages are yielded as soon as
+    they are rendered, so they can be processed while the rest still render.
+    
+    Args:
+        pdf_bytes: The raw PDF content
+        page_nums: The page numbers to render (0-indexed)
+        dpi: Rendering resolution
+        max_size: Optional limit in pixels for the longest side of each image
+    
+    Yields:
+        (page_num, jpeg_bytes) tuples in completion order
+    """
+    max_workers = max(1, min(8, os.cpu_count() or 1, len(page_nums)))
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker,
+                             initargs=(pdf_bytes,)) as executor:
+        futures = {executor.submit(_render_page_worker, page_num, dpi, max_size): page_num for page_num in page_nums}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def render_pdf_pages(pdf_bytes: bytes, page_nums: List[int], dpi: int = 150,
+                     max_size: Optional[int] = None) -> List[Tuple[int, bytes]]:
+    """
+    Render the selected PDF pages to JPEG images in parallel.
+    
+    Args:
+        pdf_bytes: The raw PDF content
+        page_nums: The page numbers to render (0-indexed)
+        dpi: Rendering resolution
+        max_size: Optional limit in pixels for the longest side of each image
+    
+    Returns:
+        List of (page_num, jpeg_bytes) tuples sorted by page number
+    """
+    # Restore page order, pages are rendered in arbitrary order
+    return sorted(iter_render_pdf_pages(pdf_bytes, page_nums, dpi, max_size), key=lambda item: item[0])
+
+def render_page_thumbnails(pdf_bytes: bytes, page_nums: List[int], dpi: int = 30) -> List[bytes]:
+    """Render low-resolution PNG previews of PDF pages, opening the document once."""
+    with open_pdf(pdf_bytes) as doc:
+        return [doc[page_num].get_pixmap(dpi=dpi).tobytes("png") for page_num in page_nums]
+
+def has_text_layer(page_text: str, min_chars: int = MIN_TEXT_LAYER_CHARS) -> bool:
+    """Check whether a page's embedded text is long enough and not mostly unmapped glyphs."""
+    text = page_text.strip()
+    if len(text) < min_chars:
+        return False
+    
+    unmapped = sum(len(match.group()) for match in _UNMAPPED_GLYPH_RE.finditer(text))
+    return unmapped < len(text) * 0.1
+
+def get_text_layer_pages(pdf_bytes: bytes, page_nums: List[int],
+                         min_chars: int = MIN_TEXT_LAYER_CHARS) -> Dict[int, str]:
+    """
+    Extract the embedded text of pages that have a usable text layer.
+    
+    Born-digital pages can be translated from their text directly, skipping
+    rasterization and image translation.
+    
+    Args:
+        pdf_bytes: The raw PDF content
+        page_nums: The page numbers to check (0-indexed)
+        min_chars: Minimum number of characters for a text layer to be used
+    
+    Returns:
+        Dictionary mapping page numbers to their text, for pages with a text layer
+    """
+    try:
+        with open_pdf(pdf_bytes) as doc:
+            page_texts = {}
+            for page_num in page_nums:
+                page_text = doc[page_num].get_text("text")
+                if has_text_layer(page_text, min_chars):
+                    page_texts[page_num] = page_text
+            return page_texts
+    
+    except Exception as e:
+        raise Exception(f"Error reading PDF text layer: {str(e)}")
+
 def get_pdf_info(pdf_file) -> Dict[str, any]:
     """Get PDF information using PyMuPDF."""
     try:
-        pdf_bytes = pdf_file.getvalue() if hasattr(pdf_file, 'getvalue') else pdf_file.read()
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        
-        info = {
-            "num_pages": len(doc),
-            "metadata": doc.metadata,
-            "file_size": len(pdf_bytes) / 1024  # Size in KB
-        }
+        pdf_bytes = read_pdf_bytes(pdf_file)
+        with open_pdf(pdf_bytes) as doc:
+            info = {
+                "num_pages": len(doc),
+                "metadata": doc.metadata,
+                "file_size": len(pdf_bytes) / 1024  # Size in KB
+            }
         
-        doc.close()
         return info
         
     except Exception as e:
@@ -258,25 +650,63 @@ def chunk_text(text: str, max_chunk_size: int = 4000) -> List[str]:
         max_chunk_size: Maximum size of each chunk
     
     Returns:
-        List of text chunks
+        List of text chunks, none of them empty
     """
+    # Text that fits in one chunk is returned as is, without splitting it
+    if len(text) <= max_chunk_size:
+        return [text.strip()] if text.strip() else []
+    
     # Split by double newlines (paragraphs) first
     paragraphs = text.split('\n\n')
     
     chunks = []
-    current_chunk = ""
+    current_chunk = []
+    current_size = 0
+    
+    # Paragraphs longer than a chunk are broken up, a single oversized chunk
+    # would take far longer to translate than the others
+    paragraphs = [piece for paragraph in paragraphs for piece in _split_paragraph(paragraph, max_chunk_size)]
     
     for paragraph in paragraphs:
         # If adding this paragraph exceeds the max size and we already have some content,
         # add the current chunk to the list and start a new one
-        if len(current_chunk) + len(paragraph) > max_chunk_size and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = paragraph + "\n\n"
-        else:
-            current_chunk += paragraph + "\n\n"
+        if current_size + len(paragraph) > max_chunk_size and current_chunk:
+            chunks.append("\n\n".join(current_chunk).strip())
+            current_chunk = []
+            current_size = 0
+        
+        # Paragraphs are joined once per chunk instead of growing a string
+        current_chunk.append(paragraph)
+        current_size += len(paragraph) + 2
     
     # Add the last chunk if it's not empty
     if current_chunk:
-        chunks.append(current_chunk.strip())
+        chunks.append("\n\n".join(current_chunk).strip())
     
-    return chunks
+    # Runs of blank lines leave chunks without text, which would only come
+    # back as empty translations and mark their page as failed
+    return [chunk for chunk in chunks if chunk]
+
+def _split_paragraph(paragraph: str, max_size: int) -> List[str]:
+    """Split a paragraph into pieces of at most max_size characters at line or sentence ends."""
+    if len(paragraph) <= max_size:
+        return [paragraph]
+    
+    # Prefer line breaks, then sentence ends, and cut mid-sentence only as a last resort
+    for separator in _PARAGRAPH_SPLIT_PATTERNS:
+        parts = [part for part in separator.split(paragraph) if part]
+        if len(parts) > 1:
+            break
+    else:
+        return [paragraph[i:i + max_size] for i in range(0, len(paragraph), max_size)]
+    
+    pieces = []
+    current = ""
+    for part in parts:
+        if current and len(current) + len(part) > max_size:
+            pieces.append(current)
+            current = ""
+        current += part
+    pieces.append(current)
+    return [piece for part in pieces for piece in _split_paragraph(part, max_size)]
+
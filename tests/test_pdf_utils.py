@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_utils import _estimate_ocr_dpi, chunk_text, OCR_MIN_DPI, OCR_ADAPTIVE_MAX_DPI
+
+
+def make_page(doc: fitz.Document, font_size: float, words: int = 8, gray: float = 0,
+              black_box: bool = False) -> fitz.Page:
+    """Add a page of evenly spaced text lines at the given font size."""
+    page = doc.new_page()
+    if black_box:
+        page.draw_rect(fitz.Rect(300, 100, 550, 400), color=(0, 0, 0), fill=(0, 0, 0))
+    y = 72
+    while y < 780:
+        page.insert_text((72, y), " ".join(["example"] * words), fontsize=font_size, color=(gray, gray, gray))
+        y += font_size * 1.5
+    return page
+
+
+class EstimateOcrDpiTest(unittest.TestCase):
+    def setUp(self):
+        self.doc = fitz.open()
+    
+    def tearDown(self):
+        self.doc.close()
+    
+    def test_dpi_follows_font_size(self):
+        dpis = {size: _estimate_ocr_dpi(make_page(self.doc, size)) for size in (6, 8, 12, 18, 24)}
+        self.assertEqual(dpis[6], OCR_ADAPTIVE_MAX_DPI)
+        self.assertGreater(dpis[8], dpis[12])
+        self.assertGreater(dpis[12], dpis[18])
+        self.assertTrue(250 <= dpis[12] <= 330, dpis[12])
+        self.assertEqual(dpis[24], OCR_MIN_DPI)
+    
+    def test_same_layout_gives_same_dpi(self):
+        expected = _estimate_ocr_dpi(make_page(self.doc, 12))
+        self.assertEqual(_estimate_ocr_dpi(make_page(self.doc, 12, words=2)), expected)
+        self.assertEqual(_estimate_ocr_dpi(make_page(self.doc, 12, gray=0.5)), expected)
+        self.assertEqual(_estimate_ocr_dpi(make_page(self.doc, 12, gray=0.2)), expected)
+    
+    def test_filled_box_is_not_a_text_line(self):
+        expected = _estimate_ocr_dpi(make_page(self.doc, 12))
+        self.assertEqual(_estimate_ocr_dpi(make_page(self.doc, 12, black_box=True)), expected)
+
+
+class ChunkTextTest(unittest.TestCase):
+    def test_blank_text_has_no_chunks(self):
+        self.assertEqual(chunk_text(" \n\n "), [])
+    
+    def test_whitespace_runs_leave_no_empty_chunks(self):
+        text = "a" * 3000 + "\n\n" + " " * 5000 + "\n\n" + "b" * 3000
+        self.assertEqual(chunk_text(text, 4000), ["a" * 3000, "b" * 3000])
+
+
+if __name__ == "__main__":
+    unittest.main()
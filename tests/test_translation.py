@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from google.api_core import exceptions as google_exceptions
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import translation
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Model that translates every text to its upper case and counts its requests."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        # Both prompts end with the texts, after a "...to translate:" line
+        body = contents.split("to translate:\n", 1)[1]
+        texts = translation._SEGMENT_TAG_RE.split(body)
+        if len(texts) == 1:
+            return FakeResponse(body.upper())
+        return FakeResponse("".join(
+            f"{translation.SEGMENT_TAG.format(index)}\n{text.strip().upper()}\n"
+            for index, text in zip(texts[1::2], texts[2::2])
+        ))
+
+
+class IterTranslateChunksCacheTest(unittest.TestCase):
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        patcher = mock.patch.dict(os.environ, {"TRANSLATER_CACHE_DIR": cache_dir.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.model = FakeModel()
+        patcher = mock.patch.object(translation, "get_gemini_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        
+        self.chunks = ["first chunk", "second chunk", "first chunk", "third chunk"]
+    
+    def translate(self):
+        return dict(translation.iter_translate_chunks(self.chunks, batch_chars=30))
+    
+    def test_second_run_makes_no_api_calls(self):
+        first = self.translate()
+        self.assertEqual(first, {0: "FIRST CHUNK", 1: "SECOND CHUNK", 2: "FIRST CHUNK", 3: "THIRD CHUNK"})
+        self.assertGreater(self.model.calls, 0)
+        
+        self.model.calls = 0
+        self.assertEqual(self.translate(), first)
+        self.assertEqual(self.model.calls, 0)
+    
+    def test_prompt_change_invalidates_cache(self):
+        self.translate()
+        self.model.calls = 0
+        with mock.patch.object(translation, "get_translation_prompt", return_value="A different prompt"):
+            self.translate()
+        self.assertGreater(self.model.calls, 0)
+    
+    def test_model_change_invalidates_cache(self):
+        self.translate()
+        self.model.calls = 0
+        with mock.patch.object(translation, "TRANSLATION_MODEL", "another-model"):
+            translation.get_translation_cache_salt.cache_clear()
+            self.addCleanup(translation.get_translation_cache_salt.cache_clear)
+            self.translate()
+        self.assertGreater(self.model.calls, 0)
+
+
+class FailingModel:
+    """Model whose requests all fail with an error that is not retried."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_content(self, contents, **kwargs):
+        self.calls += 1
+        raise google_exceptions.InvalidArgument("bad request")
+
+
+class BatchFailureTest(unittest.TestCase):
+    def setUp(self):
+        self.model = FailingModel()
+        patcher = mock.patch.object(translation, "get_gemini_model", return_value=self.model)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_failed_text_batch_is_not_resent_per_text(self):
+        results = translation.translate_text_batch(["first", "second", "third"])
+        self.assertEqual(self.model.calls, 1)
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(translation.is_translation_error(result) for result in results))
+    
+    def test_failed_image_batch_is_not_resent_per_page(self):
+        results = translation.translate_image_batch([b"page one", b"page two"])
+        self.assertEqual(self.model.calls, 1)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(translation.is_translation_error(result) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
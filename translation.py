@@ -1,23 +1,200 @@
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+import functools
+import hashlib
+import importlib.util
 import os
-from typing import List, Dict, Any, Optional, Literal
+import random
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from typing import List, Dict, Any, Optional, Literal, Callable, Iterable, Iterator, Tuple, Union
 from PIL import Image
 from io import BytesIO
+from translation_store import open_page_cache, save_cached_translation, load_cached_translation
 
 # Supported translation providers
 TranslationProvider = Literal["gemini"]
 
+# Page images are PIL images or JPEG bytes that are already encoded
+PageImage = Union[Image.Image, bytes]
+
+# JPEG quality of page images that are encoded for upload
+IMAGE_JPEG_QUALITY = 85
+
+# Longest side of page images that are encoded for upload, Gemini tiles
+# images into small crops so larger pages only cost bandwidth and tokens
+IMAGE_MAX_SIDE = 2048
+
+# Arabic elongation character, which only stretches words for typesetting
+_TATWEEL = "\u0640"
+
+# Marker separating per-page translations in a multi-page response
+PAGE_BREAK = "<<<PAGE_BREAK>>>"
+
+# Tag in front of each text of a batched text request and of its translation
+SEGMENT_TAG = "<<<SEG {}>>>"
+_SEGMENT_TAG_RE = re.compile(r'<<<SEG (\d+)>>>')
+
+# Gemini model used for all translation requests
+TRANSLATION_MODEL = 'gemini-2.0-flash-exp'
+
+# Generation settings for all translation requests, a low temperature keeps
+# the model to the source text instead of adding commentary
+GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "top_p": 0.8,
+    "top_k": 40
+}
+
+# Prefixes of the messages returned in place of a translation when it fails
+TRANSLATION_ERROR_PREFIXES = (
+    "Translation error:",
+    "No readable text could be found",
+    "Error translating page",
+)
+
+# API key the SDK is currently configured with, shared by all sessions
+_configured_api_key = None
+_configure_lock = threading.Lock()
+
+# Model instances bound to the configured key, by model name and system instruction
+_models = {}
+
+# Default number of API requests kept in flight at once
+DEFAULT_CONCURRENCY = 8
+
+# Short text chunks are sent together in one request up to this many characters
+TEXT_BATCH_MAX_CHARS = 8000
+
+# Number of attempts for a request that keeps failing with a transient error
+RETRY_ATTEMPTS = 5
+
+# Longest wait in seconds between attempts of a failed request
+RETRY_MAX_DELAY = 60
+
+# Errors that go away by themselves, any other error is not retried
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+# Retry delay suggested by the API in a rate limit error
+_RETRY_DELAY_RE = re.compile(r'retry_delay\s*\{\s*seconds:\s*(\d+)')
+
+def _iter_concurrently(func: Callable[[Any], Any], items: List[Any],
+                       concurrency: int) -> Iterator[Tuple[int, Any]]:
+    """
+    Apply a function to every item using a pool of worker threads.
+    
+    API calls spend almost all of their time waiting on the network, so
+    threads overlap them well. Results are yielded in the calling thread,
+    which keeps Streamlit updates out of the worker threads.
+    
+    Args:
+        func: The function to apply to each item
+        items: The items to process
+        concurrency: Maximum number of calls in flight
+    
+    Yields:
+        (index, result) tuples in completion order
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def _group_duplicates(keys: List[Any]) -> List[List[int]]:
+    """Group the indices of equal keys, in order of first appearance."""
+    groups = {}
+    for i, key in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    return list(groups.values())
+
+def _generate_content(model: genai.GenerativeModel, contents: Any, **kwargs) -> Any:
+    """
+    Call generate_content, waiting and retrying on transient errors.
+    
+    Rate limits, unavailable servers and timeouts are retried, other errors
+    are raised straight away since repeating the request cannot fix them.
+    The wait follows the retry delay suggested by the API when there is one,
+    and backs off exponentially otherwise. Random jitter keeps concurrent
+    requests that were limited together from all retrying at the same moment.
+    """
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return model.generate_content(contents, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == RETRY_ATTEMPTS - 1:
+                raise
+            match = _RETRY_DELAY_RE.search(str(e))
+            delay = int(match.group(1)) if match else 5 * 2 ** attempt
+            delay = min(delay, RETRY_MAX_DELAY) + random.uniform(0, 1)
+            print(f"{type(e).__name__}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+def is_translation_error(text: Optional[str]) -> bool:
+    """Check whether a translation result is an error message rather than a translation."""
+    return not text or text.startswith(TRANSLATION_ERROR_PREFIXES)
+
 def initialize_gemini_api(api_key: str) -> None:
     """
     Initialize the Gemini API with the provided key.
     
+    The SDK configuration is process-wide, so it is only rebuilt when the
+    key differs from the one already in use. The SDK keeps one client per
+    service, so all requests then share a single gRPC channel and skip the
+    TLS handshake after the first one. Where grpc is not installed, the
+    REST transport is used instead.
+    
     Args:
         api_key: The API key for Gemini
     """
-    genai.configure(api_key=api_key)
+    global _configured_api_key
+    
+    with _configure_lock:
+        if api_key != _configured_api_key:
+            transport = "grpc" if importlib.util.find_spec("grpc") else "rest"
+            genai.configure(api_key=api_key, transport=transport)
+            _configured_api_key = api_key
+            # Models keep the client they were first used with, so drop them
+            _models.clear()
+
+def get_gemini_model(model_name: str = TRANSLATION_MODEL,
+                     system_instruction: Optional[str] = None) -> genai.GenerativeModel:
+    """
+    Get the shared model instance for the currently configured API key.
+    
+    The translation prompts are static per language pair, so they are set as
+    the model's system instruction once instead of being prepended to every
+    request, and every request shares the same cacheable prefix.
+    
+    Args:
+        model_name: The Gemini model to use
+        system_instruction: Optional instructions the model follows for every request
+    
+    Returns:
+        The model instance, shared by all calls with the same arguments
+    """
+    key = (model_name, system_instruction)
+    with _configure_lock:
+        if key not in _models:
+            _models[key] = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+        return _models[key]
 
+@functools.lru_cache(maxsize=32)
 def get_translation_prompt(source_lang: str, target_lang: str) -> str:
-    """Get the appropriate translation prompt based on source language."""
+    """
+    Get the appropriate translation prompt based on source language.
+    
+    Prompts are built once per language pair, every request of a run then
+    passes the same string on to get_gemini_model.
+    """
     
     if source_lang.lower() == "auto-detect":
         return f"""You are an expert translator. First, analyze and identify the source language of the text.
@@ -84,18 +261,14 @@ def translate_text(text: str, provider: TranslationProvider = "gemini",
         source_lang: The source language
         target_lang: The target language
     """
-    if not text.strip():
-        return ""
+    # Page numbers, rules and other text without letters have nothing to translate
+    if not _has_letters(text):
+        return text.strip()
     
     try:
         if provider == "gemini":
-            try:
-                model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            except Exception:
-                model = genai.GenerativeModel('gemini-1.5-flash')
-            
-            prompt = get_translation_prompt(source_lang, target_lang) + f"\n\nText to translate:\n{text}"
-            response = model.generate_content(prompt)
+            model = get_gemini_model(TRANSLATION_MODEL, get_translation_prompt(source_lang, target_lang))
+            response = _generate_content(model, f"Text to translate:\n{text}", generation_config=GENERATION_CONFIG)
             
             if response and hasattr(response, 'text'):
                 return response.text.strip()
@@ -106,9 +279,174 @@ def translate_text(text: str, provider: TranslationProvider = "gemini",
         return f"Translation error: {str(e)}. Please check your input and try again."
 
 
+def translate_text_batch(texts: List[str], provider: TranslationProvider = "gemini",
+                         source_lang: str = "Arabic", target_lang: str = "Italian") -> List[str]:
+    """
+    Translate several texts with a single API request.
+    
+    Every text and its translation are tagged with SEGMENT_TAG and their
+    index, so the translations are matched to the texts by index rather than
+    by position. Texts whose translation is missing from the response are
+    translated individually. If the request itself fails, every text gets the
+    error message.
+    
+    Args:
+        texts: List of texts to translate
+        provider: The translation provider to use ("gemini")
+        source_lang: The source language
+        target_lang: The target language
+    
+    Returns:
+        List of translated text, one entry per input text
+    """
+    if len(texts) == 1:
+        return [translate_text(texts[0], provider, source_lang, target_lang)]
+    
+    prompt = f"""The following {len(texts)} texts are consecutive parts of the same document.
+        Each text starts with a line containing only its tag, such as {SEGMENT_TAG.format(0)}.
+        Translate each text separately and start each translation with a line
+        containing only the tag of its text.
+        """ + f"\n\nTexts to translate:\n" + "\n".join(
+            f"{SEGMENT_TAG.format(i)}\n{text}" for i, text in enumerate(texts))
+    
+    # A failed request has already been retried, sending each text on its own
+    # would only wait out the same errors again
+    try:
+        model = get_gemini_model(TRANSLATION_MODEL, get_translation_prompt(source_lang, target_lang))
+        response = _generate_content(model, prompt, generation_config=GENERATION_CONFIG)
+    except Exception as e:
+        print(f"Batch translation error: {str(e)}")
+        return [f"Translation error: {str(e)}. Please check your input and try again."] * len(texts)
+    
+    translations = {}
+    try:
+        # Split into alternating tag indices and the translations following them
+        parts = _SEGMENT_TAG_RE.split(response.text)
+        for index, translation in zip(parts[1::2], parts[2::2]):
+            index, translation = int(index), translation.strip()
+            if index < len(texts) and translation:
+                translations.setdefault(index, translation)
+        
+        # Text before the first tag is a header for the whole response, such as
+        # the detected language, which single-text calls keep at the top
+        header = parts[0].strip()
+        if header and 0 in translations:
+            translations[0] = f"{header}\n\n{translations[0]}"
+    except ValueError as e:
+        # response.text raises when the response has no text, e.g. when it was blocked
+        print(f"Batch response has no text: {str(e)}")
+    if len(translations) < len(texts):
+        print(f"Batch response is missing {len(texts) - len(translations)} of {len(texts)} texts, "
+              "translating them individually")
+    
+    return [translations[i] if i in translations else translate_text(text, provider, source_lang, target_lang)
+            for i, text in enumerate(texts)]
+
+def _has_letters(text: str) -> bool:
+    """Check whether a text contains any letter, in any script."""
+    return any(char.isalpha() for char in text)
+
+def _batch_texts(texts: List[str], max_chars: int) -> List[List[int]]:
+    """Group consecutive texts into batches of at most max_chars characters, by index."""
+    batches = []
+    batch_chars = max_chars
+    for i, text in enumerate(texts):
+        # Texts without letters need no request and are kept on their own
+        if not _has_letters(text):
+            batches.append([i])
+            batch_chars = max_chars
+        elif batch_chars + len(text) <= max_chars:
+            batches[-1].append(i)
+            batch_chars += len(text)
+        else:
+            batches.append([i])
+            batch_chars = len(text)
+    return batches
+
+@functools.lru_cache(maxsize=32)
+def get_translation_cache_salt(prompt: str) -> bytes:
+    """
+    Hash the model, generation settings and prompt that translations are made with.
+    
+    The hash salts every translation cache key, so cached translations stop
+    being reused as soon as any of them changes.
+    
+    Args:
+        prompt: The system instruction the translations are made with
+    
+    Returns:
+        16-byte salt for blake2b
+    """
+    settings = f"{TRANSLATION_MODEL}\n{sorted(GENERATION_CONFIG.items())}\n{prompt}"
+    return hashlib.blake2b(settings.encode(), digest_size=16).digest()
+
+def _translation_cache_key(text: str, salt: bytes) -> str:
+    """
+    Hash a text for the translation cache, ignoring differences that do not change its meaning.
+    
+    Extracted and OCR'd text of the same passage often differs only in
+    whitespace, Arabic presentation forms or tatweel, which NFKC normalization,
+    collapsing whitespace and deleting tatweel remove.
+    """
+    normalized = unicodedata.normalize("NFKC", " ".join(text.split())).replace(_TATWEEL, "")
+    return hashlib.blake2b(normalized.encode(), digest_size=16, salt=salt).hexdigest()
+
+def iter_translate_chunks(chunks: List[str], provider: TranslationProvider = "gemini",
+                          source_lang: str = "Arabic", target_lang: str = "Italian",
+                          concurrency: int = DEFAULT_CONCURRENCY,
+                          batch_chars: int = TEXT_BATCH_MAX_CHARS) -> Iterator[Tuple[int, str]]:
+    """
+    Translate multiple chunks of text, yielding each one as soon as it is done.
+    
+    Chunks translated before, in this document or another, are taken from
+    the shared translation cache. Short consecutive chunks are sent together
+    in a single request, which saves requests against the API rate limit.
+    
+    Args:
+        chunks: List of text chunks to translate
+        provider: The translation provider to use ("gemini")
+        source_lang: The source language (default: Arabic)
+        target_lang: The target language (default: Italian)
+        concurrency: Maximum number of requests in flight at the same time
+        batch_chars: Maximum number of characters sent in a single request
+    
+    Yields:
+        (chunk_index, translated_text) tuples in completion order
+    """
+    # Identical chunks are translated once and the result shared
+    groups = _group_duplicates(chunks)
+    unique_chunks = [chunks[group[0]] for group in groups]
+    salt = get_translation_cache_salt(get_translation_prompt(source_lang, target_lang))
+    chunk_hashes = [_translation_cache_key(chunk, salt) for chunk in unique_chunks]
+    
+    with closing(open_page_cache()) as cache:
+        pending = []
+        for unique_index, chunk_hash in enumerate(chunk_hashes):
+            cached = load_cached_translation(cache, chunk_hash, source_lang, target_lang)
+            if cached is None:
+                pending.append(unique_index)
+                continue
+            for i in groups[unique_index]:
+                yield i, cached
+        
+        batches = [[pending[j] for j in batch]
+                   for batch in _batch_texts([unique_chunks[i] for i in pending], batch_chars)]
+        for batch_index, translated_texts in _iter_concurrently(
+            lambda batch: translate_text_batch([unique_chunks[i] for i in batch], provider, source_lang, target_lang),
+            batches, concurrency
+        ):
+            for unique_index, translated_text in zip(batches[batch_index], translated_texts):
+                # Failed translations are not cached, so they are retried on the next run
+                if translated_text and not is_translation_error(translated_text):
+                    save_cached_translation(cache, chunk_hashes[unique_index], source_lang, target_lang,
+                                            translated_text)
+                for i in groups[unique_index]:
+                    yield i, translated_text
+
 def translate_chunks(chunks: List[str], provider: TranslationProvider = "gemini",
                     source_lang: str = "Arabic", target_lang: str = "Italian", 
-                    callback=None) -> List[str]:
+                    callback=None, concurrency: int = DEFAULT_CONCURRENCY,
+                    batch_chars: int = TEXT_BATCH_MAX_CHARS) -> List[str]:
     """
     Translate multiple chunks of text using the selected provider.
     
@@ -118,137 +456,253 @@ def translate_chunks(chunks: List[str], provider: TranslationProvider = "gemini"
         source_lang: The source language (default: Arabic)
         target_lang: The target language (default: Italian)
         callback: Optional callback function to update progress
+        concurrency: Maximum number of requests in flight at the same time
+        batch_chars: Maximum number of characters sent in a single request
     
     Returns:
         List of translated text chunks
     """
-    translated_chunks = []
+    translated_chunks = [None] * len(chunks)
     
-    for i, chunk in enumerate(chunks):
-        translated_text = translate_text(chunk, provider, source_lang, target_lang)
-        translated_chunks.append(translated_text)
+    for completed, (i, translated_text) in enumerate(
+            iter_translate_chunks(chunks, provider, source_lang, target_lang, concurrency, batch_chars), 1):
+        translated_chunks[i] = translated_text
         
         if callback:
-            callback(i + 1, len(chunks))
+            callback(completed, len(chunks))
     
     return translated_chunks
 
-def translate_image(image: Image.Image, provider: TranslationProvider = "gemini",
-                   source_lang: str = "Auto-Detect", target_lang: str = "English") -> Optional[str]:
+@functools.lru_cache(maxsize=32)
+def get_image_translation_prompt(source_lang: str, target_lang: str) -> str:
+    """Get the prompt used to translate the text found in page images."""
+    
+    if source_lang.lower() == "auto-detect":
+        return f"""You are an expert translator analyzing this image.
+                First, identify the language of any text in the image.
+                Then translate it to {target_lang}.
+                
+                REQUIREMENTS:
+                1. First identify the source language
+                2. Translate ALL visible text to {target_lang}
+                3. Maintain formatting and structure
+                4. For special terms: keep original in arabic  with translations
+                
+                OUTPUT FORMAT:
+                Detected Language: [language name]
+
+                [Translation in {target_lang}]
+                """
+    else:
+        return f"""You are an expert translator analyzing this page from {source_lang} to {target_lang}.
+                Your task is to provide a clear and accurate translation.
+                
+                REQUIREMENTS:
+                1. Translate ALL visible text from {source_lang} to {target_lang}
+                2. Maintain the original formatting and structure
+                3. For Arabic religious terms: keep them in Arabic followed by translation in parentheses
+                4. If text is unclear, make educated guesses based on context
+                
+                OUTPUT FORMAT:
+                - Only provide the {target_lang} translation
+                - Preserve paragraph breaks and structure
+                - Use appropriate {target_lang} punctuation
+
+                IMPORTANT: If you see any text in the image, you must translate it. 
+                If the image appears blank or unreadable, explicitly state that.
+                """
+
+def _image_part(image: PageImage, max_size: int = IMAGE_MAX_SIDE) -> Dict[str, Any]:
+    """Build the Gemini content part for a page image."""
+    # Encoded JPEG pages are passed through without decoding them again
+    if isinstance(image, bytes):
+        return {"mime_type": "image/jpeg", "data": image}
+    
+    # RGB images are used as they are, convert() would copy the whole image
+    img = image if image.mode == 'RGB' else image.convert('RGB')
+    # Downscale to max_size into a new image, thumbnail() would resize the
+    # caller's image in place
+    if max(img.size) > max_size:
+        scale = max_size / max(img.size)
+        img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                         Image.Resampling.LANCZOS, reducing_gap=2.0)
+    
+    # JPEG encodes scanned pages many times faster than PNG and uploads less
+    img_byte_arr = BytesIO()
+    img.save(img_byte_arr, format='JPEG', quality=IMAGE_JPEG_QUALITY)
+    return {"mime_type": "image/jpeg", "data": img_byte_arr.getvalue()}
+
+def translate_image(image: PageImage, provider: TranslationProvider = "gemini",
+                   source_lang: str = "Auto-Detect", target_lang: str = "English",
+                   max_size: int = IMAGE_MAX_SIDE) -> Optional[str]:
     """Translate text from an image using the selected provider."""
-    max_retries = 3
+    image_part = _image_part(image, max_size)
+    
+    # Transient API errors are already retried by _generate_content
+    try:
+        model = get_gemini_model(TRANSLATION_MODEL,
+                                 get_image_translation_prompt(source_lang, target_lang))
+        response = _generate_content(model, [image_part], generation_config=GENERATION_CONFIG)
+        translated_text = response.text.strip()
+    except Exception as e:
+        print(f"Image translation error: {str(e)}")
+        return f"Translation error: {str(e)}. Please check your input and try again."
+    
+    if not translated_text:
+        return "No readable text could be found on this page. Please check the image quality and try again."
+    return translated_text
+
+def translate_image_batch(images: List[PageImage], provider: TranslationProvider = "gemini",
+                          source_lang: str = "Auto-Detect", target_lang: str = "English") -> List[str]:
+    """
+    Translate several page images with a single API request.
+    
+    The model is asked to separate the per-page translations with PAGE_BREAK.
+    If the response cannot be split back into one translation per image, the
+    batch falls back to translating each image individually. If the request
+    itself fails, every image gets the error message.
+    
+    Args:
+        images: List of PIL Images or JPEG bytes (one per PDF page)
+        provider: The translation provider to use ("gemini")
+        source_lang: The source language
+        target_lang: The target language
+    
+    Returns:
+        List of translated text, one entry per image
+    """
+    if len(images) == 1:
+        return [translate_image(images[0], provider, source_lang, target_lang)]
+    
+    prompt = f"""The following {len(images)} images are consecutive pages of the same document.
+                Translate each page separately, in the order given.
+                Separate the translations of consecutive pages with a line containing only {PAGE_BREAK}
+                """
+    
+    # A failed request has already been retried, sending each page on its own
+    # would only wait out the same errors again
+    try:
+        model = get_gemini_model(TRANSLATION_MODEL, get_image_translation_prompt(source_lang, target_lang))
+        contents = [prompt] + [_image_part(img) for img in images]
+        response = _generate_content(model, contents, generation_config=GENERATION_CONFIG)
+    except Exception as e:
+        print(f"Batch translation error: {str(e)}")
+        return [f"Translation error: {str(e)}. Please check your input and try again."] * len(images)
+    
+    try:
+        pages = [page.strip() for page in response.text.split(PAGE_BREAK)]
+        if len(pages) == len(images) and all(pages):
+            return pages
+    except ValueError as e:
+        # response.text raises when the response has no text, e.g. when it was blocked
+        print(f"Batch response has no text: {str(e)}")
+    print(f"Batch response could not be split into {len(images)} pages, translating individually")
     
-    # Preprocess image to improve quality
-    img = image.convert('RGB')
-    # Resize if image is too large (max 4096x4096)
-    if img.size[0] > 4096 or img.size[1] > 4096:
-        img.thumbnail((4096, 4096), Image.Resampling.LANCZOS)
+    return [translate_image(img, provider, source_lang, target_lang) for img in images]
+
+def iter_translate_pdf_pages(images: Iterable[PageImage], provider: TranslationProvider = "gemini",
+                             source_lang: str = "Arabic", target_lang: str = "Italian",
+                             batch_size: int = 1,
+                             concurrency: int = DEFAULT_CONCURRENCY) -> Iterator[Tuple[int, str]]:
+    """
+    Translate multiple PDF pages, yielding each page as soon as it is done.
+    
+    Images are consumed lazily and each batch is sent as soon as it is full,
+    so pages can still be rendering while earlier ones are being translated.
+    
+    Args:
+        images: PIL Images or JPEG bytes (one per PDF page), any iterable
+        provider: The translation provider to use ("gemini")
+        source_lang: The source language (default: Arabic)
+        target_lang: The target language (default: Italian)
+        batch_size: Number of pages sent to the model in a single request
+        concurrency: Maximum number of requests in flight at the same time
+    
+    Yields:
+        (page_index, translated_text) tuples in completion order
+    """
+    batch_size = max(1, batch_size)
     
-    for attempt in range(max_retries):
+    def translate_batch(batch_indices: List[int], batch: List[PageImage]) -> List[str]:
         try:
-            img_byte_arr = BytesIO()
-            img.save(img_byte_arr, format='PNG', optimize=True, quality=95)
-            img_byte_arr = img_byte_arr.getvalue()
-            
-            try:
-                model = genai.GenerativeModel('gemini-2.0-flash-exp')
-                
-                if source_lang.lower() == "auto-detect":
-                    prompt = f"""You are an expert translator analyzing this image.
-                            First, identify the language of any text in the image.
-                            Then translate it to {target_lang}.
-                            
-                            REQUIREMENTS:
-                            1. First identify the source language
-                            2. Translate ALL visible text to {target_lang}
-                            3. Maintain formatting and structure
-                            4. For special terms: keep original in arabic  with translations
-                            
-                            OUTPUT FORMAT:
-                            Detected Language: [language name]
-
-                            [Translation in {target_lang}]
-                            """
+            return translate_image_batch(batch, provider, source_lang, target_lang)
+        except Exception as e:
+            error_messages = []
+            for i in batch_indices:
+                error_message = f"Error translating page {i+1}: {str(e)}"
+                print(error_message)
+                error_messages.append(error_message)
+            return error_messages
+    
+    # Identical pages (blank pages, repeated separators) are translated once
+    # and the result is shared with every copy
+    first_indices = {}
+    copies = {}
+    translations = {}
+    futures = {}
+    
+    def collect(done) -> Iterator[Tuple[int, str]]:
+        for future in done:
+            for i, translated_text in zip(futures.pop(future), future.result()):
+                translations[i] = translated_text
+                for copy_index in copies.pop(i):
+                    yield copy_index, translated_text
+    
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        batch_indices, batch = [], []
+        for i, image in enumerate(images):
+            # Only encoded pages are compared, hashing a PIL page would copy its
+            # whole raster, so each of those is treated as unique
+            key = hashlib.blake2b(image, digest_size=16).digest() if isinstance(image, bytes) else i
+            if key in first_indices:
+                first_index = first_indices[key]
+                if first_index in translations:
+                    yield i, translations[first_index]
                 else:
-                    prompt = f"""You are an expert translator analyzing this page from {source_lang} to {target_lang}.
-                            Your task is to provide a clear and accurate translation.
-                            
-                            REQUIREMENTS:
-                            1. Translate ALL visible text from {source_lang} to {target_lang}
-                            2. Maintain the original formatting and structure
-                            3. For Arabic religious terms: keep them in Arabic followed by translation in parentheses
-                            4. If text is unclear, make educated guesses based on context
-                            
-                            OUTPUT FORMAT:
-                            - Only provide the {target_lang} translation
-                            - Preserve paragraph breaks and structure
-                            - Use appropriate {target_lang} punctuation
-
-                            IMPORTANT: If you see any text in the image, you must translate it. 
-                            If the image appears blank or unreadable, explicitly state that.
-                            """
-                
-                response = model.generate_content([
-                    prompt, 
-                    {"mime_type": "image/png", "data": img_byte_arr}
-                ], generation_config={
-                    "temperature": 0.2,
-                    "top_p": 0.8,
-                    "top_k": 40
-                })
-                
-                if response and hasattr(response, 'text'):
-                    translated_text = response.text.strip()
-                    if translated_text:
-                        return translated_text
-                    else:
-                        raise Exception("Empty response from model")
-                        
-            except Exception as e:
-                print(f"Vision model error (attempt {attempt + 1}): {str(e)}")
-                if attempt == max_retries - 1:  # Last attempt
-                    raise e
+                    copies[first_index].append(i)
                 continue
             
-        except Exception as e:
-            if attempt == max_retries - 1:  # Last attempt
-                print(f"Image translation error after {max_retries} attempts: {str(e)}")
-                return "No readable text could be found on this page. Please check the image quality and try again."
-    
-    return "Translation failed after multiple attempts. Please try again."
+            first_indices[key] = i
+            copies[i] = [i]
+            batch_indices.append(i)
+            batch.append(image)
+            if len(batch) == batch_size:
+                futures[executor.submit(translate_batch, batch_indices, batch)] = batch_indices
+                batch_indices, batch = [], []
+            
+            # Hand back pages that finished while the input was being produced
+            yield from collect([future for future in futures if future.done()])
+        
+        if batch:
+            futures[executor.submit(translate_batch, batch_indices, batch)] = batch_indices
+        yield from collect(as_completed(list(futures)))
 
-def translate_pdf_pages(images: List[Image.Image], provider: TranslationProvider = "gemini",
+def translate_pdf_pages(images: List[PageImage], provider: TranslationProvider = "gemini",
                        source_lang: str = "Arabic", target_lang: str = "Italian",
-                       callback=None) -> List[str]:
+                       callback=None, batch_size: int = 1,
+                       concurrency: int = DEFAULT_CONCURRENCY) -> List[str]:
     """
     Translate multiple PDF pages using the selected provider.
     
     Args:
-        images: List of PIL Image objects (one per PDF page)
+        images: List of PIL Images or JPEG bytes (one per PDF page)
         provider: The translation provider to use ("gemini")
         source_lang: The source language (default: Arabic)
         target_lang: The target language (default: Italian)
         callback: Optional callback function to update progress
+        batch_size: Number of pages sent to the model in a single request
+        concurrency: Maximum number of requests in flight at the same time
     
-    Returns:
     Returns:
         List of translated text for each page
     """
-    translated_pages = []
+    translated_pages = [None] * len(images)
     
-    for i, image in enumerate(images):
-        try:
-            translated_text = translate_image(image, provider, source_lang, target_lang)
-            translated_pages.append(translated_text)
-            
-            if callback:
-                callback(i + 1, len(images))
-        except Exception as e:
-            error_message = f"Error translating page {i+1}: {str(e)}"
-            print(error_message)
-            translated_pages.append(error_message)
-            
-            if callback:
-                callback(i + 1, len(images))
+    for completed, (i, translated_text) in enumerate(
+            iter_translate_pdf_pages(images, provider, source_lang, target_lang, batch_size, concurrency), 1):
+        translated_pages[i] = translated_text
+        
+        if callback:
+            callback(completed, len(images))
     
     return translated_pages
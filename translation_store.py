@@ -0,0 +1,199 @@
+import functools
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Per-file translation stores untouched for this many days are deleted
+STORE_MAX_AGE_DAYS = 30
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory holding the translation stores and caches, creating it if needed.
+    
+    The directory is TRANSLATER_CACHE_DIR when set, and a translater folder
+    in the user's cache directory otherwise. A directory created here is
+    only accessible to the user running the app, since the stores hold
+    translated documents.
+    
+    Returns:
+        Path of the cache directory
+    """
+    cache_root = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return _prepare_cache_dir(os.getenv("TRANSLATER_CACHE_DIR") or os.path.join(cache_root, "translater"))
+
+@functools.lru_cache(maxsize=None)
+def _prepare_cache_dir(path: str) -> Path:
+    """Create a cache directory once, warning when an existing one is open to other users."""
+    cache_dir = Path(path)
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True)
+    except FileExistsError:
+        # The mode of an existing directory is the user's choice, it is left alone
+        if cache_dir.stat().st_mode & 0o077:
+            print(f"Warning: cache directory {cache_dir} is accessible to other users")
+    return cache_dir
+
+def get_store_path(file_hash: str) -> Path:
+    """Get the path of the on-disk translation store for a file."""
+    return get_cache_dir() / f"translate_{file_hash}.db"
+
+def prune_translation_stores(max_age_days: float = STORE_MAX_AGE_DAYS) -> None:
+    """Delete the per-file translation stores that were not written to for max_age_days."""
+    cutoff = time.time() - max_age_days * 86400
+    page_cache_path = get_page_cache_path()
+    for path in get_cache_dir().glob("translate_*.db"):
+        if path == page_cache_path:
+            continue
+        # Recent writes may still sit in the WAL files next to the database
+        store_files = [path, Path(f"{path}-wal"), Path(f"{path}-shm")]
+        try:
+            if max(file.stat().st_mtime for file in store_files if file.exists()) < cutoff:
+                for file in store_files:
+                    file.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Error deleting translation store {path.name}: {str(e)}")
+
+def get_page_cache_path() -> Path:
+    """Get the path of the translation and OCR cache shared by all files."""
+    return get_cache_dir() / "translate_page_cache.db"
+
+def open_translation_store(file_hash: str) -> sqlite3.Connection:
+    """
+    Open the on-disk translation store for a file, creating it if needed.
+    
+    Translations live in SQLite instead of the Streamlit
+    session, so session memory no longer grows with the document size.
+    Translations are kept per language pair, so an interrupted or repeated
+    run only has to translate the pages that are still missing. Opening the
+    store of a new file deletes the stores of files not used for
+    STORE_MAX_AGE_DAYS.
+    
+    Args:
+        file_hash: Hash of the uploaded file content
+    
+    Returns:
+        Open SQLite connection in autocommit mode
+    """
+    store_path = get_store_path(file_hash)
+    if not store_path.exists():
+        prune_translation_stores()
+    conn = sqlite3.connect(store_path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS translations ("
+        "page_num INTEGER, source_lang TEXT, target_lang TEXT, translation TEXT, "
+        "failed INTEGER NOT NULL DEFAULT 0, "
+        "PRIMARY KEY (page_num, source_lang, target_lang))"
+    )
+    return conn
+
+def save_page_translation(conn: sqlite3.Connection, page_num: int, source_lang: str,
+                          target_lang: str, translation: str, failed: bool = False) -> None:
+    """Store the translation of a page, replacing any previous one."""
+    conn.execute(
+        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+        (page_num, source_lang, target_lang, translation, int(failed))
+    )
+
+def load_page_translations(conn: sqlite3.Connection, source_lang: str, target_lang: str,
+                           page_nums: List[int], include_failed: bool = True) -> Dict[int, str]:
+    """
+    Load the stored translations of the given pages.
+    
+    Args:
+        conn: Open translation store
+        source_lang: The source language
+        target_lang: The target language
+        page_nums: The page numbers to load (0-indexed)
+        include_failed: Whether to include pages whose translation failed
+    
+    Returns:
+        Dictionary mapping page numbers to their translation
+    """
+    rows = conn.execute(
+        "SELECT page_num, translation, failed FROM translations "
+        "WHERE source_lang = ? AND target_lang = ?",
+        (source_lang, target_lang)
+    )
+    wanted = set(page_nums)
+    return {
+        page_num: translation
+        for page_num, translation, failed in rows
+        if page_num in wanted and (include_failed or not failed)
+    }
+
+def open_page_cache() -> sqlite3.Connection:
+    """
+    Open the translation cache shared by all files, creating it if needed.
+    
+    Pages are keyed by a hash of their content instead of their position, so
+    a page that reappears in another upload (a revised version of the same
+    document, shared boilerplate) is not translated again.
+    
+    Returns:
+        Open SQLite connection in autocommit mode
+    """
+    conn = sqlite3.connect(get_page_cache_path(), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS page_cache ("
+        "content_hash TEXT, source_lang TEXT, target_lang TEXT, translation TEXT, "
+        "PRIMARY KEY (content_hash, source_lang, target_lang))"
+    )
+    return conn
+
+def save_cached_translation(conn: sqlite3.Connection, content_hash: str, source_lang: str,
+                            target_lang: str, translation: str) -> None:
+    """Store the translation of a page's content in the shared cache."""
+    conn.execute(
+        "INSERT OR REPLACE INTO page_cache VALUES (?, ?, ?, ?)",
+        (content_hash, source_lang, target_lang, translation)
+    )
+
+def load_cached_translation(conn: sqlite3.Connection, content_hash: str, source_lang: str,
+                            target_lang: str) -> Optional[str]:
+    """Load the cached translation of a page's content, if there is one."""
+    row = conn.execute(
+        "SELECT translation FROM page_cache "
+        "WHERE content_hash = ? AND source_lang = ? AND target_lang = ?",
+        (content_hash, source_lang, target_lang)
+    ).fetchone()
+    return row[0] if row else None
+
+def open_ocr_cache() -> sqlite3.Connection:
+    """
+    Open the OCR cache shared by all files, creating it if needed.
+    
+    OCR results are keyed by a hash of the rendered page image and the
+    tesseract settings, so shared boilerplate pages and documents that are
+    opened again are not OCR'd again. The cache lives next to the translation
+    cache and is also used from OCR worker processes.
+    
+    Returns:
+        Open SQLite connection in autocommit mode
+    """
+    conn = sqlite3.connect(get_page_cache_path(), isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS ocr_cache ("
+        "image_hash TEXT, lang TEXT, config TEXT, text TEXT, "
+        "PRIMARY KEY (image_hash, lang, config))"
+    )
+    return conn
+
+def save_cached_ocr(conn: sqlite3.Connection, image_hash: str, lang: str, config: str, text: str) -> None:
+    """Store the OCR text of a page image in the shared cache."""
+    conn.execute(
+        "INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?)",
+        (image_hash, lang, config, text)
+    )
+
+def load_cached_ocr(conn: sqlite3.Connection, image_hash: str, lang: str, config: str) -> Optional[str]:
+    """Load the cached OCR text of a page image, if there is one."""
+    row = conn.execute(
+        "SELECT text FROM ocr_cache WHERE image_hash = ? AND lang = ? AND config = ?",
+        (image_hash, lang, config)
+    ).fetchone()
+    return row[0] if row else None